@@ -0,0 +1,142 @@
+"""Проверки настроек, от которых зависит скорость в продакшене.
+
+Запускаются вместе с остальными проверками развёртывания:
+python manage.py check --deploy --tag performance
+"""
+from django.conf import settings
+from django.core.checks import Warning, register
+from django.utils.module_loading import import_string
+
+PERFORMANCE = 'performance'
+
+CACHED_LOADER = 'django.template.loaders.cached.Loader'
+HASHED_STORAGE = 'django.contrib.staticfiles.storage.ManifestFilesMixin'
+LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+DB_SESSIONS = 'django.contrib.sessions.backends.db'
+
+
+def _uses_cached_loader(template):
+    options = template.get('OPTIONS', {})
+    loaders = options.get('loaders')
+    if loaders is None:
+        # Без явного списка Django сам включает кэш при debug=False.
+        return not options.get('debug', settings.DEBUG)
+    return any(
+        isinstance(loader, (list, tuple)) and loader[0] == CACHED_LOADER
+        for loader in loaders
+    )
+
+
+@register(PERFORMANCE, deploy=True)
+def check_debug(app_configs, **kwargs):
+    if not settings.DEBUG:
+        return []
+    return [Warning(
+        'DEBUG включён: каждый SQL-запрос сохраняется в памяти, '
+        'шаблоны не кэшируются.',
+        id='core.W001',
+    )]
+
+
+@register(PERFORMANCE, deploy=True)
+def check_templates(app_configs, **kwargs):
+    return [
+        Warning(
+            'Шаблоны читаются и компилируются заново на каждый запрос.',
+            hint=f'Добавьте {CACHED_LOADER} в OPTIONS["loaders"].',
+            id='core.W002',
+        )
+        for template in settings.TEMPLATES
+        if template['BACKEND'].endswith('DjangoTemplates')
+        and not _uses_cached_loader(template)
+    ]
+
+
+@register(PERFORMANCE, deploy=True)
+def check_databases(app_configs, **kwargs):
+    errors = []
+    wal = str(settings.SQLITE_PRAGMAS.get('journal_mode')).lower() == 'wal'
+    for alias, database in settings.DATABASES.items():
+        if not database.get('CONN_MAX_AGE'):
+            errors.append(Warning(
+                f'База {alias} открывает новое соединение на каждый запрос.',
+                hint='Задайте CONN_MAX_AGE.',
+                id='core.W003',
+            ))
+        if database['ENGINE'].endswith('sqlite3') and not wal:
+            errors.append(Warning(
+                f'База {alias} на SQLite без WAL: запись блокирует чтение.',
+                hint='Задайте SQLITE_PRAGMAS["journal_mode"] = "wal".',
+                id='core.W009',
+            ))
+    return errors
+
+
+@register(PERFORMANCE, deploy=True)
+def check_caches(app_configs, **kwargs):
+    return [
+        Warning(
+            f'Кэш {alias} не общий для процессов: версии лент и '
+            f'карточки у каждого воркера свои.',
+            hint='Используйте memcached или другой общий кэш.',
+            id='core.W004',
+        )
+        for alias, cache in settings.CACHES.items()
+        if cache['BACKEND'] in LOCAL_CACHES
+    ]
+
+
+@register(PERFORMANCE, deploy=True)
+def check_static_files(app_configs, **kwargs):
+    storage = import_string(settings.STATICFILES_STORAGE)
+    if issubclass(storage, import_string(HASHED_STORAGE)):
+        return []
+    return [Warning(
+        'Имена статики не содержат хеш, её нельзя кэшировать надолго.',
+        hint='Используйте ManifestStaticFilesStorage.',
+        id='core.W005',
+    )]
+
+
+@register(PERFORMANCE, deploy=True)
+def check_sessions(app_configs, **kwargs):
+    errors = []
+    if settings.SESSION_ENGINE == DB_SESSIONS:
+        errors.append(Warning(
+            'Сессия читается из базы на каждый запрос.',
+            hint='Используйте cached_db или cache.',
+            id='core.W006',
+        ))
+    if settings.SESSION_SAVE_EVERY_REQUEST:
+        errors.append(Warning(
+            'SESSION_SAVE_EVERY_REQUEST записывает сессию на каждый запрос.',
+            id='core.W007',
+        ))
+    return errors
+
+
+@register(PERFORMANCE, deploy=True)
+def check_uploads(app_configs, **kwargs):
+    if settings.DATA_UPLOAD_MAX_MEMORY_SIZE is not None:
+        return []
+    return [Warning(
+        'Размер тела запроса не ограничен.',
+        hint='Задайте DATA_UPLOAD_MAX_MEMORY_SIZE.',
+        id='core.W008',
+    )]
+
+
+@register(PERFORMANCE, deploy=True)
+def check_throttling(app_configs, **kwargs):
+    if not settings.THROTTLE_RATES or settings.THROTTLE_CLIENT_IP_HEADER:
+        return []
+    return [Warning(
+        'Гости ограничиваются по REMOTE_ADDR: за обратным прокси у всех '
+        'один адрес и одно ведро на весь сайт.',
+        hint='Задайте THROTTLE_CLIENT_IP_HEADER и THROTTLE_TRUSTED_PROXIES '
+             'или отключите предупреждение, если прокси нет.',
+        id='core.W010',
+    )]
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from core.middleware import query_stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Показывает по каждому URL число запросов, SQL-запросов на запрос '
+        'и время в БД; самые дорогие по времени в БД — первыми.'
+    )
+
+    def handle(self, *args, **options):
+        stats = sorted(
+            query_stats().items(),
+            key=lambda item: item[1]['db_time'], reverse=True
+        )
+        for name, row in stats:
+            requests = row['requests'] or 1
+            self.stdout.write(
+                f'{name}: запросов {row["requests"]}, '
+                f'SQL на запрос {row["queries"] / requests:.1f}, '
+                f'БД на запрос {row["db_time"] * 1000 / requests:.1f} мс'
+            )
@@ -0,0 +1,39 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.replicas import PRIMARY, copy_database
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite в файлы реплик из '
+        'DATABASE_REPLICAS, чтобы проверять чтение с реплик локально.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Повторять каждые N секунд; 0 — один запуск.'
+        )
+
+    def handle(self, *args, interval, **options):
+        primary = settings.DATABASES[PRIMARY]
+        if not primary['ENGINE'].endswith('sqlite3'):
+            raise CommandError('Файловые реплики бывают только у SQLite.')
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError(
+                'Реплик нет: задайте YATUBE_SQLITE_REPLICAS.')
+        while True:
+            started = time.monotonic()
+            for alias in settings.DATABASE_REPLICAS:
+                copy_database(
+                    primary['NAME'], settings.DATABASES[alias]['NAME'])
+            self.stdout.write(
+                f'Реплик обновлено: {len(settings.DATABASE_REPLICAS)}, '
+                f'{time.monotonic() - started:.2f} с'
+            )
+            if not interval:
+                return
+            time.sleep(interval)
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from core.throttling import throttle_stats
+
+
+class Command(BaseCommand):
+    help = 'Показывает счётчики пропущенных и отклонённых запросов.'
+
+    def handle(self, *args, **options):
+        for scope, stats in throttle_stats().items():
+            self.stdout.write(
+                f'{scope}: пропущено {stats["allowed"]}, '
+                f'отклонено {stats["throttled"]}'
+            )
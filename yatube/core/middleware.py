@@ -0,0 +1,143 @@
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.core.cache import cache
+from django.db import connections
+from django.urls import URLResolver, get_resolver
+
+from . import replicas
+
+# Время в БД копится целыми микросекундами: cache.incr не умеет float.
+QUERY_STATS_FIELDS = ('requests', 'queries', 'db_us')
+
+
+class QueryCounter:
+    """Считает запросы и время в БД, подключается через execute_wrapper."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.queries += 1
+
+
+def stats_key(view_name, field):
+    return f'query_stats:{view_name}:{field}'
+
+
+def record(view_name, counter):
+    """Добавляет итоги запроса к счётчикам URL в общем кэше."""
+    values = (1, counter.queries, round(counter.db_time * 1_000_000))
+    for field, value in zip(QUERY_STATS_FIELDS, values):
+        key = stats_key(view_name, field)
+        try:
+            cache.incr(key, value)
+        except ValueError:
+            cache.set(key, value, None)
+
+
+def view_names(patterns=None, prefix=''):
+    """Имена всех URL проекта вместе с пространствами имён."""
+    if patterns is None:
+        patterns = get_resolver().url_patterns
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            namespace = pattern.namespace
+            yield from view_names(
+                pattern.url_patterns,
+                f'{prefix}{namespace}:' if namespace else prefix
+            )
+        elif pattern.name:
+            yield f'{prefix}{pattern.name}'
+
+
+def query_stats():
+    """{имя URL: {'requests', 'queries', 'db_time'}} по всем процессам.
+
+    Возвращаются только URL, к которым были запросы; db_time в секундах.
+    """
+    keys = {
+        stats_key(name, field): (name, field)
+        for name in set(view_names()) for field in QUERY_STATS_FIELDS
+    }
+    stats = {}
+    for key, value in cache.get_many(keys).items():
+        name, field = keys[key]
+        stats.setdefault(name, dict.fromkeys(QUERY_STATS_FIELDS, 0))
+        stats[name][field] = value
+    return {
+        name: {
+            'requests': row['requests'],
+            'queries': row['queries'],
+            'db_time': row['db_us'] / 1_000_000,
+        }
+        for name, row in stats.items()
+    }
+
+
+class QueryCountMiddleware:
+    """Собирает число SQL-запросов и время в БД по имени URL.
+
+    Итоги запроса сохраняются в response.query_count и response.db_time,
+    копятся в общем кэше (их показывает команда query_stats) и при
+    QUERY_STATS_HEADER отдаются заголовком X-DB-Queries.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+        match = getattr(request, 'resolver_match', None)
+        if match is not None:
+            record(match.view_name, counter)
+        response.query_count = counter.queries
+        response.db_time = counter.db_time
+        if getattr(settings, 'QUERY_STATS_HEADER', False):
+            response['X-DB-Queries'] = (
+                f'{counter.queries}; time={counter.db_time * 1000:.1f}ms'
+            )
+        return response
+
+
+class ReplicaMiddleware:
+    """Включает чтение с реплик для безопасных запросов.
+
+    Запрос авторизованного пользователя, который что-то записал (любой
+    пишущий метод или, например, подписка по GET), закрепляет его
+    чтения за default на REPLICA_PIN_SECONDS.
+    Ставится после AuthenticationMiddleware.
+    """
+
+    safe_methods = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.method not in self.safe_methods:
+            response = self.get_response(request)
+            wrote = True
+        # Сессия читается до включения реплик: она может быть создана
+        # только что и ещё не доехать до реплики.
+        elif replicas.is_pinned(request.session.get(SESSION_KEY)):
+            return self.get_response(request)
+        else:
+            with replicas.replica_reads() as state:
+                response = self.get_response(request)
+            wrote = state['wrote']
+        if wrote and request.user.is_authenticated:
+            replicas.pin(request.user.pk)
+        return response
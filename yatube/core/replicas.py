@@ -0,0 +1,94 @@
+"""Чтение с реплик, запись в основную базу.
+
+Реплики перечислены в DATABASE_REPLICAS. С них читают только
+безопасные запросы (GET, HEAD), их включает ReplicaMiddleware;
+команды, сигналы и пишущие запросы всегда работают с default. Если
+безопасный запрос всё же пишет (подписка по GET), его чтения после
+записи тоже идут в default. После записи пользователь
+REPLICA_PIN_SECONDS секунд читает с default, чтобы сразу видеть свой
+пост, комментарий или подписку, даже если реплика ещё не догнала
+основную базу.
+"""
+import random
+import sqlite3
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+PRIMARY = 'default'
+
+# Состояние блока replica_reads: {'wrote': была ли запись}.
+_replica_state = ContextVar('replica_state', default=None)
+
+
+@contextmanager
+def replica_reads():
+    """Разрешает чтение с реплик внутри блока до первой записи.
+
+    Возвращает состояние блока: по state['wrote'] видно, писал ли код
+    внутри него в базу.
+    """
+    state = {'wrote': False}
+    token = _replica_state.set(state)
+    try:
+        yield state
+    finally:
+        _replica_state.reset(token)
+
+
+def pin_key(user_id):
+    return f'core:primary:{user_id}'
+
+
+def pin(user_id):
+    """Отправляет чтения пользователя в default на время после записи."""
+    cache.set(pin_key(user_id), True, settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned(user_id):
+    return user_id is not None and cache.get(pin_key(user_id), False)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _replica_state.get()
+        if not settings.DATABASE_REPLICAS or state is None or state['wrote']:
+            return PRIMARY
+        # Реплика-зеркало default (TEST MIRROR в тестах) — та же база,
+        # читать с неё через отдельное соединение незачем.
+        primary = connections[PRIMARY].settings_dict['NAME']
+        aliases = [
+            alias for alias in settings.DATABASE_REPLICAS
+            if connections[alias].settings_dict['NAME'] != primary
+        ]
+        return random.choice(aliases) if aliases else PRIMARY
+
+    def db_for_write(self, model, **hints):
+        state = _replica_state.get()
+        if state is not None:
+            state['wrote'] = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # На всех базах одни и те же данные.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Реплики получают схему вместе с данными из default.
+        return db not in settings.DATABASE_REPLICAS
+
+
+def copy_database(source, target):
+    """Копирует файл SQLite через backup API: копия согласована, даже
+    если в базу в это время пишут, а читатели реплики не видят
+    наполовину записанный файл."""
+    source_db = sqlite3.connect(source)
+    target_db = sqlite3.connect(target)
+    try:
+        source_db.backup(target_db)
+    finally:
+        target_db.close()
+        source_db.close()
@@ -0,0 +1,25 @@
+"""Настройка каждого нового соединения с SQLite.
+
+По умолчанию SQLite работает в журнале отката: пока идёт запись,
+читатели ждут, а кэш страниц — всего 2 МБ. Прагмы из SQLITE_PRAGMAS
+выполняются сразу после открытия соединения; journal_mode=wal хранится
+в самом файле базы, остальные действуют только на это соединение.
+"""
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+
+def configure(connection, pragmas=None):
+    if pragmas is None:
+        pragmas = settings.SQLITE_PRAGMAS
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def on_connection_created(sender, connection, **kwargs):
+    if connection.vendor == 'sqlite':
+        configure(connection)
+
+
+connection_created.connect(on_connection_created)
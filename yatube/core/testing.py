@@ -0,0 +1,18 @@
+class QueryBudgetMixin:
+    """Проверка бюджета SQL-запросов для TestCase.
+
+    Бюджеты задаются атрибутом query_budgets: {'app:view_name': число}.
+    Число запросов берётся из QueryCountMiddleware.
+    """
+
+    query_budgets = {}
+
+    def assertQueryBudget(self, response, budget=None):
+        view_name = response.resolver_match.view_name
+        if budget is None:
+            budget = self.query_budgets[view_name]
+        self.assertLessEqual(
+            response.query_count, budget,
+            f'{view_name}: {response.query_count} SQL-запросов '
+            f'при бюджете {budget}'
+        )
@@ -0,0 +1,44 @@
+from django.core.checks import registry
+from django.test import SimpleTestCase, override_settings
+
+from core.checks import PERFORMANCE
+from yatube import settings_production
+
+PRODUCTION_SETTINGS = (
+    'DEBUG', 'TEMPLATES', 'DATABASES', 'CACHES', 'SESSION_ENGINE',
+    'STATICFILES_STORAGE', 'DATA_UPLOAD_MAX_MEMORY_SIZE',
+    'THROTTLE_CLIENT_IP_HEADER',
+)
+
+
+class PerformanceChecksTests(SimpleTestCase):
+    def check_ids(self):
+        return {
+            error.id for error in registry.run_checks(
+                tags=[PERFORMANCE], include_deployment_checks=True)
+        }
+
+    @override_settings(
+        DEBUG=True,
+        SQLITE_PRAGMAS={},
+        SESSION_ENGINE='django.contrib.sessions.backends.db',
+        SESSION_SAVE_EVERY_REQUEST=True,
+        DATA_UPLOAD_MAX_MEMORY_SIZE=None,
+        STATICFILES_STORAGE=(
+            'django.contrib.staticfiles.storage.StaticFilesStorage'),
+    )
+    def test_slow_defaults_are_reported(self):
+        """Медленные значения по умолчанию дают предупреждения."""
+        self.assertEqual(self.check_ids(), {
+            'core.W001', 'core.W002', 'core.W003', 'core.W004',
+            'core.W005', 'core.W006', 'core.W007', 'core.W008', 'core.W009',
+            'core.W010',
+        })
+
+    def test_production_settings_pass(self):
+        """Настройки продакшена проходят все проверки."""
+        with self.settings(**{
+            name: getattr(settings_production, name)
+            for name in PRODUCTION_SETTINGS
+        }):
+            self.assertEqual(self.check_ids(), set())
@@ -0,0 +1,32 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.middleware import query_stats
+
+
+class QueryStatsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_stats_are_collected_per_url(self):
+        """Итоги копятся по имени URL, запросы мимо URL не учитываются."""
+        client = Client()
+        client.get(reverse('posts:index'))
+        response = client.get(reverse('posts:index'))
+        client.get('/nonexistent-page/')
+        stats = query_stats()
+        self.assertEqual(set(stats), {'posts:index'})
+        self.assertEqual(stats['posts:index']['requests'], 2)
+        self.assertGreaterEqual(
+            stats['posts:index']['queries'], response.query_count)
+
+    def test_command_prints_stats(self):
+        """query_stats выводит собранные итоги."""
+        Client().get(reverse('posts:index'))
+        out = StringIO()
+        call_command('query_stats', stdout=out)
+        self.assertIn('posts:index: запросов 1', out.getvalue())
@@ -0,0 +1,30 @@
+import os
+import tempfile
+
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import SimpleTestCase
+
+
+class SqlitePragmaTests(SimpleTestCase):
+    def pragma(self, wrapper, name):
+        with wrapper.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_new_connection_is_tuned(self):
+        """Новое соединение с файлом базы получает прагмы из настроек."""
+        with tempfile.TemporaryDirectory() as path:
+            wrapper = DatabaseWrapper(
+                {**connection.settings_dict,
+                 'NAME': os.path.join(path, 'db.sqlite3')},
+                alias='pragmas'
+            )
+            try:
+                self.assertEqual(self.pragma(wrapper, 'journal_mode'), 'wal')
+                self.assertEqual(self.pragma(wrapper, 'busy_timeout'), 5000)
+                self.assertEqual(
+                    self.pragma(wrapper, 'cache_size'), -64 * 1024)
+                self.assertEqual(self.pragma(wrapper, 'temp_store'), 2)
+            finally:
+                wrapper.close()
@@ -0,0 +1,119 @@
+"""Ограничение частоты запросов к пишущим страницам.
+
+Используется token bucket: у каждого клиента (пользователя, а для
+гостей — IP, за прокси — из THROTTLE_CLIENT_IP_HEADER) в каждой
+области THROTTLE_RATES своё ведро на capacity
+токенов, которое равномерно наполняется за period секунд. Ведра лежат
+в общем кэше, поэтому лимит действует на все процессы сразу. Кэш не
+даёт атомарного чтения-записи, и при гонке клиент может получить
+один-два лишних запроса — для защиты от перегрузки этого достаточно.
+"""
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.shortcuts import render
+
+OUTCOMES = ('allowed', 'throttled')
+
+
+def client_ip(request):
+    """IP клиента с учётом доверенных обратных прокси.
+
+    Каждый прокси дописывает в заголовок адрес, с которого к нему
+    пришли, поэтому доверять можно только последним
+    THROTTLE_TRUSTED_PROXIES адресам: начало списка подделывает клиент.
+    """
+    header = settings.THROTTLE_CLIENT_IP_HEADER
+    if header:
+        addresses = [
+            address.strip()
+            for address in request.META.get(header, '').split(',')
+            if address.strip()
+        ]
+        if len(addresses) >= settings.THROTTLE_TRUSTED_PROXIES:
+            return addresses[-settings.THROTTLE_TRUSTED_PROXIES]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def client_id(request):
+    if request.user.is_authenticated:
+        return f'user:{request.user.pk}'
+    return f'ip:{client_ip(request)}'
+
+
+def take_token(scope, client, now=None):
+    """Забирает токен из ведра; 0 — запрос разрешён, иначе сколько
+    секунд ждать следующего токена."""
+    capacity, period = settings.THROTTLE_RATES[scope]
+    rate = capacity / period
+    now = time.time() if now is None else now
+    key = f'throttle:{scope}:{client}'
+    tokens, updated = cache.get(key, (capacity, now))
+    tokens = min(capacity, tokens + (now - updated) * rate)
+    if tokens < 1:
+        return (1 - tokens) / rate
+    # За period простоя ведро наполняется целиком, хранить дольше незачем.
+    cache.set(key, (tokens - 1, now), math.ceil(period))
+    return 0
+
+
+def stats_key(scope, outcome):
+    return f'throttle:stats:{scope}:{outcome}'
+
+
+def count(scope, outcome):
+    key = stats_key(scope, outcome)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def throttle_stats():
+    """{область: {'allowed': n, 'throttled': n}} по всем процессам."""
+    keys = {
+        stats_key(scope, outcome): (scope, outcome)
+        for scope in settings.THROTTLE_RATES for outcome in OUTCOMES
+    }
+    values = cache.get_many(keys)
+    stats = {
+        scope: dict.fromkeys(OUTCOMES, 0)
+        for scope in settings.THROTTLE_RATES
+    }
+    for key, value in values.items():
+        scope, outcome = keys[key]
+        stats[scope][outcome] = value
+    return stats
+
+
+def throttle(scope, methods=None):
+    """Декоратор view: при пустом ведре отвечает 429 с Retry-After.
+
+    methods — какие методы ограничивать (по умолчанию все), staff
+    не ограничивается.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if (
+                scope in settings.THROTTLE_RATES
+                and (methods is None or request.method in methods)
+                and not request.user.is_staff
+            ):
+                wait = take_token(scope, client_id(request))
+                if wait:
+                    count(scope, 'throttled')
+                    retry_after = math.ceil(wait)
+                    response = render(
+                        request, 'core/429.html',
+                        {'retry_after': retry_after}, status=429
+                    )
+                    response['Retry-After'] = str(retry_after)
+                    return response
+                count(scope, 'allowed')
+            return view(request, *args, **kwargs)
+        return wrapped
+    return decorator
@@ -1,5 +1,6 @@
 from django.contrib import admin
 
+from . import thumbnails
 from .models import Post
 
 
@@ -30,3 +31,7 @@ class PostAdmin(admin.ModelAdmin):
     search_fields = ('text',)
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        thumbnails.schedule(obj)
@@ -0,0 +1,132 @@
+"""JSON API лент только для чтения.
+
+Строки выбираются через values() и только с запрошенными колонками,
+экземпляры моделей не создаются. Клиент выбирает поля параметром
+?fields=id,text,author и листает страницы курсором из ответа.
+"""
+import orjson
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import HttpResponse
+
+from .models import Comment, Group, Post, TimelineEntry, User
+from .timeline import TIMELINE_KEYS
+from .utils import COMMENT_KEYS, pagin
+
+API_KEYS = ('-pub_date', '-id')
+
+POST_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'author': 'author__username',
+    'group': 'group__slug',
+    'image': 'image',
+    'comments_count': 'comments_count',
+}
+
+COMMENT_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'created': 'created',
+    'author': 'author__username',
+}
+
+
+def json_response(data, status=200):
+    return HttpResponse(
+        orjson.dumps(data), content_type='application/json', status=status
+    )
+
+
+def not_found():
+    return json_response({'detail': 'Не найдено.'}, status=404)
+
+
+def selected_fields(request, available, param='fields'):
+    """Запрошенные поля; неизвестные пропускаются, без выбора — все."""
+    names = [
+        name for name in request.GET.get(param, '').split(',')
+        if name in available
+    ]
+    return list(dict.fromkeys(names)) or list(available)
+
+
+def serialize(rows, names, lookups):
+    results = []
+    for row in rows:
+        item = {name: row[lookup] for name, lookup in zip(names, lookups)}
+        if item.get('image'):
+            item['image'] = default_storage.url(item['image'])
+        elif 'image' in item:
+            item['image'] = None
+        results.append(item)
+    return results
+
+
+def feed_page(request, queryset, keys=API_KEYS, prefix='',
+              available=POST_FIELDS, param='fields', per_page=None):
+    names = selected_fields(request, available, param)
+    lookups = [prefix + available[name] for name in names]
+    columns = dict.fromkeys(lookups + [key.lstrip('-') for key in keys])
+    page_obj = pagin(request, queryset.values(*columns), keys, per_page)
+    return {
+        'results': serialize(page_obj, names, lookups),
+        'next': page_obj.next_cursor,
+        'previous': page_obj.previous_cursor,
+    }
+
+
+def index(request):
+    return json_response(feed_page(request, Post.objects.all()))
+
+
+def group_list(request, slug):
+    group_id = (
+        Group.objects.filter(slug=slug).values_list('pk', flat=True).first()
+    )
+    if group_id is None:
+        return not_found()
+    return json_response(
+        feed_page(request, Post.objects.filter(group_id=group_id))
+    )
+
+
+def profile(request, username):
+    author_id = (
+        User.objects.filter(username=username)
+        .values_list('pk', flat=True).first()
+    )
+    if author_id is None:
+        return not_found()
+    return json_response(
+        feed_page(request, Post.objects.filter(author_id=author_id))
+    )
+
+
+def follow_index(request):
+    if not request.user.is_authenticated:
+        return json_response(
+            {'detail': 'Требуется авторизация.'}, status=401
+        )
+    entries = TimelineEntry.objects.filter(user=request.user)
+    return json_response(
+        feed_page(request, entries, TIMELINE_KEYS, prefix='post__')
+    )
+
+
+def post_detail(request, post_id):
+    names = selected_fields(request, POST_FIELDS)
+    lookups = [POST_FIELDS[name] for name in names]
+    rows = Post.objects.filter(pk=post_id).values(*lookups)[:1]
+    if not rows:
+        return not_found()
+    comments = feed_page(
+        request, Comment.objects.filter(post_id=post_id), COMMENT_KEYS,
+        available=COMMENT_FIELDS, param='comment_fields',
+        per_page=settings.COMMENT_LIMIT
+    )
+    return json_response({
+        'post': serialize(rows, names, lookups)[0],
+        'comments': comments,
+    })
@@ -0,0 +1,53 @@
+"""Помощники для bulk_create в обход save().
+
+В Django 2.2 bulk_create на SQLite не возвращает pk, а auto_now_add
+перезаписывает даты, которые пришли вместе с данными. Здесь — как
+заранее занять блок ключей и вставить строки с их собственными датами.
+"""
+from contextlib import contextmanager
+
+from django.db import connection
+
+
+def reserve_pks(model, count):
+    """Занимает count подряд идущих pk и возвращает первый из них.
+
+    Счётчик AUTOINCREMENT в sqlite_sequence сдвигается первой же
+    записью транзакции, поэтому параллельные вставки ждут её коммита
+    и потом получают ключи выше занятого блока. Вызывать внутри
+    transaction.atomic.
+    """
+    table = model._meta.db_table
+    column = model._meta.pk.column
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'INSERT INTO sqlite_sequence (name, seq) SELECT %s, 0 '
+            'WHERE NOT EXISTS '
+            '(SELECT 1 FROM sqlite_sequence WHERE name = %s)',
+            [table, table]
+        )
+        cursor.execute(
+            f'UPDATE sqlite_sequence SET seq = max(seq, '
+            f'(SELECT coalesce(max({column}), 0) FROM {table})) + %s '
+            f'WHERE name = %s',
+            [count, table]
+        )
+        cursor.execute(
+            'SELECT seq FROM sqlite_sequence WHERE name = %s', [table])
+        top = cursor.fetchone()[0]
+    return top - count + 1
+
+
+@contextmanager
+def explicit_dates(model, field_name):
+    """Внутри блока поле auto_now_add сохраняет заданное значение.
+
+    Меняется общее для процесса описание поля, поэтому блок нужен только
+    в командах, а не в обработчиках запросов.
+    """
+    field = model._meta.get_field(field_name)
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
@@ -0,0 +1,56 @@
+"""Кэш отрисованных карточек постов, общий для всех лент.
+
+Ключ карточки включает хеш всех выводимых в ней данных: правка поста,
+переименование автора или смена группы дают новый ключ, и устаревшая
+карточка просто перестаёт запрашиваться.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+
+from . import thumbnails
+
+CARD_TEMPLATE = 'posts/includes/post_card.html'
+# Увеличивается при изменении разметки карточки.
+CARD_TEMPLATE_VERSION = 1
+
+
+def card_key(post):
+    author, group = post.author, post.group
+    data = '\0'.join(str(value) for value in (
+        CARD_TEMPLATE_VERSION,
+        post.text,
+        post.image.name,
+        post.pub_date.isoformat(),
+        author.username,
+        author.get_full_name(),
+        group.slug if group else '',
+        group.title if group else '',
+    ))
+    return f'posts:card:{post.pk}:{hashlib.md5(data.encode()).hexdigest()}'
+
+
+def render_cards(posts):
+    """HTML карточек страницы: один get_many, отрисовка только промахов.
+
+    Карточка с ещё не готовой миниатюрой не кэшируется, чтобы заглушка
+    не пережила появление картинки.
+    """
+    posts = list(posts)
+    keys = [card_key(post) for post in posts]
+    cached = cache.get_many(keys)
+    fresh = {}
+    cards = []
+    for post, key in zip(posts, keys):
+        card = cached.get(key)
+        if card is None:
+            im = thumbnails.ready(post.image) if post.image else None
+            card = render_to_string(CARD_TEMPLATE, {'post': post, 'im': im})
+            if im or not post.image:
+                fresh[key] = card
+        cards.append(card)
+    if fresh:
+        cache.set_many(fresh, settings.CARD_CACHE_TIMEOUT)
+    return cards
@@ -0,0 +1,150 @@
+"""Отложенная запись комментариев (COMMENT_WRITE_BEHIND).
+
+add_comment кладёт комментарий в локальную очередь — отдельный файл
+SQLite, который не конкурирует за блокировку основной базы, — а
+flush_comments переносит очередь в базу пачками через bulk_create.
+Номер последней перенесённой записи хранится в основной базе в той же
+транзакции, что и сами комментарии, поэтому повторный перенос после
+сбоя ничего не дублирует. Номера записей свои у каждого файла очереди,
+поэтому отметка привязана к UUID, который файл получает при создании:
+новый файл (другой хост, новый релиз) начинает с нуля. Пока комментарий
+в очереди, автор видит его на странице поста.
+"""
+import sqlite3
+import uuid
+from datetime import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import counters, search
+from .bulk import explicit_dates, reserve_pks
+from .models import Comment, CommentQueueCheckpoint, Post, User
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS queue ('
+    'id INTEGER PRIMARY KEY AUTOINCREMENT, post_id INTEGER NOT NULL, '
+    'author_id INTEGER NOT NULL, text TEXT NOT NULL, created TEXT NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS queue_post_author '
+    'ON queue (post_id, author_id)',
+    'CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)',
+)
+
+
+def connect():
+    db = sqlite3.connect(settings.COMMENT_QUEUE_PATH, timeout=10)
+    db.execute('PRAGMA journal_mode=WAL')
+    db.execute('PRAGMA synchronous=FULL')
+    for statement in SCHEMA:
+        db.execute(statement)
+    return db
+
+
+def queue_id(db):
+    """UUID файла очереди; создаётся при первом обращении."""
+    with db:
+        db.execute(
+            "INSERT OR IGNORE INTO meta (key, value) VALUES ('queue_id', ?)",
+            (str(uuid.uuid4()),)
+        )
+    return db.execute(
+        "SELECT value FROM meta WHERE key = 'queue_id'").fetchone()[0]
+
+
+def enqueue(post_id, author_id, text):
+    """Записывает комментарий в очередь; возвращает его номер."""
+    db = connect()
+    try:
+        with db:
+            cursor = db.execute(
+                'INSERT INTO queue (post_id, author_id, text, created) '
+                'VALUES (?, ?, ?, ?)',
+                (post_id, author_id, text, timezone.now().isoformat())
+            )
+        return cursor.lastrowid
+    finally:
+        db.close()
+
+
+def pending(post_id, author):
+    """Ещё не перенесённые в базу комментарии автора к посту."""
+    if not settings.COMMENT_WRITE_BEHIND or not author.is_authenticated:
+        return []
+    db = connect()
+    try:
+        rows = db.execute(
+            'SELECT text, created FROM queue '
+            'WHERE post_id = ? AND author_id = ? ORDER BY id',
+            (post_id, author.pk)
+        ).fetchall()
+    finally:
+        db.close()
+    return [
+        Comment(
+            post_id=post_id, author=author, text=text,
+            created=datetime.fromisoformat(created)
+        )
+        for text, created in rows
+    ]
+
+
+def flush(batch_size=None):
+    """Переносит одну пачку очереди в базу; возвращает её размер."""
+    batch_size = batch_size or settings.COMMENT_BATCH_SIZE
+    db = connect()
+    try:
+        with transaction.atomic():
+            state, _ = CommentQueueCheckpoint.objects.get_or_create(
+                queue=queue_id(db))
+            rows = db.execute(
+                'SELECT id, post_id, author_id, text, created FROM queue '
+                'WHERE id > ? ORDER BY id LIMIT ?',
+                (state.last_id, batch_size)
+            ).fetchall()
+            if not rows:
+                return 0
+            save_comments(rows)
+            state.last_id = rows[-1][0]
+            state.save()
+        with db:
+            db.execute('DELETE FROM queue WHERE id <= ?', (rows[-1][0],))
+        return len(rows)
+    finally:
+        db.close()
+
+
+def save_comments(rows):
+    """Вставляет строки очереди в Comment со счётчиками и поиском."""
+    posts = set(Post.objects.filter(
+        pk__in={row[1] for row in rows}
+    ).values_list('pk', flat=True))
+    authors = set(User.objects.filter(
+        pk__in={row[2] for row in rows}
+    ).values_list('pk', flat=True))
+    # Комментарии к удалённым постам и от удалённых авторов
+    # пропускаются, иначе пачка никогда не пройдёт проверку FK.
+    rows = [row for row in rows if row[1] in posts and row[2] in authors]
+    if not rows:
+        return
+    # bulk_create в SQLite не возвращает pk, а они нужны поиску.
+    next_pk = reserve_pks(Comment, len(rows))
+    comments = [
+        Comment(pk=next_pk + offset, post_id=post_id, author_id=author_id,
+                text=text, created=datetime.fromisoformat(created))
+        for offset, (_, post_id, author_id, text, created) in enumerate(rows)
+    ]
+    with explicit_dates(Comment, 'created'):
+        Comment.objects.bulk_create(comments)
+
+    # Сигналы post_save при bulk_create не срабатывают.
+    per_post = {}
+    for comment in comments:
+        per_post[comment.post_id] = per_post.get(comment.post_id, 0) + 1
+    for post_id, delta in per_post.items():
+        counters.bump_post(post_id, delta)
+    search.bulk_index(
+        (search.comment_rowid(comment.pk), comment.text,
+         'comment', comment.pk, comment.post_id)
+        for comment in comments
+    )
@@ -0,0 +1,114 @@
+from django.db.models import (Count, F, IntegerField, OuterRef, Q,
+                              Subquery)
+from django.db.models.functions import Coalesce
+
+from .models import AuthorStats, Comment, Follow, Group, Post, User
+
+
+def _bump(model, pk, field, delta):
+    queryset = model.objects.filter(pk=pk)
+    if delta < 0:
+        queryset = queryset.filter(**{f'{field}__gte': -delta})
+    return queryset.update(**{field: F(field) + delta})
+
+
+def bump_author(user_id, field, delta):
+    """Сдвигает счётчик автора; строку создаёт пересчётом при её отсутствии.
+
+    При уменьшении строку не создаём: так бывает при каскадном удалении
+    пользователя, когда его счётчики уже удалены.
+    """
+    if not _bump(AuthorStats, user_id, field, delta) and delta > 0:
+        if User.objects.filter(pk=user_id).exists():
+            recount_authors(User.objects.filter(pk=user_id))
+
+
+def bump_group(group_id, delta):
+    if group_id is not None:
+        _bump(Group, group_id, 'posts_count', delta)
+
+
+def bump_post(post_id, delta):
+    _bump(Post, post_id, 'comments_count', delta)
+
+
+def author_stats(user):
+    try:
+        return user.stats
+    except AuthorStats.DoesNotExist:
+        recount_authors(User.objects.filter(pk=user.pk))
+        return AuthorStats.objects.get(pk=user.pk)
+
+
+def _count(model, field, **filters):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{field: OuterRef('pk')}, **filters)
+            .order_by()
+            .values(field)
+            .annotate(total=Count('pk'))
+            .values('total'),
+            output_field=IntegerField()
+        ),
+        0
+    )
+
+
+def _repair(queryset, model, counters, prefix, batch_size):
+    """Находит строки, где сохранённые счётчики разошлись с пересчитанными,
+    и исправляет их пачками. Возвращает число исправленных строк.
+    """
+    fields = list(counters)
+    drift = Q()
+    for name in fields:
+        drift |= ~Q(**{f'{prefix}{name}': F(f'actual_{name}')})
+    rows = queryset.annotate(
+        **{f'actual_{name}': expr for name, expr in counters.items()}
+    ).filter(drift).values('pk', *[f'actual_{name}' for name in fields])
+    fixed, batch = 0, []
+    for row in rows.iterator(chunk_size=batch_size):
+        batch.append(model(
+            pk=row['pk'],
+            **{name: row[f'actual_{name}'] for name in fields}
+        ))
+        if len(batch) >= batch_size:
+            model.objects.bulk_update(batch, fields)
+            fixed, batch = fixed + len(batch), []
+    if batch:
+        model.objects.bulk_update(batch, fields)
+    return fixed + len(batch)
+
+
+def recount_authors(queryset=None, batch_size=500):
+    if queryset is None:
+        queryset = User.objects.all()
+    AuthorStats.objects.bulk_create(
+        [
+            AuthorStats(user_id=pk)
+            for pk in queryset.filter(stats__isnull=True)
+            .values_list('pk', flat=True)
+        ],
+        batch_size=batch_size,
+        ignore_conflicts=True
+    )
+    return _repair(queryset, AuthorStats, {
+        'posts_count': _count(Post, 'author'),
+        'followers_count': _count(Follow, 'author'),
+        'following_count': _count(Follow, 'user'),
+    }, 'stats__', batch_size)
+
+
+def recount_groups(queryset=None, batch_size=500):
+    if queryset is None:
+        queryset = Group.objects.all()
+    return _repair(queryset, Group, {
+        'posts_count': _count(Post, 'group'),
+    }, '', batch_size)
+
+
+def recount_posts(queryset=None, batch_size=500):
+    if queryset is None:
+        queryset = Post.objects.all()
+    return _repair(queryset, Post, {
+        'comments_count': _count(Comment, 'post'),
+    }, '', batch_size)
@@ -0,0 +1,77 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Comment, Post
+
+EXPORT_CHUNK_SIZE = 2000
+
+CSV_COLUMNS = (
+    'type', 'id', 'author', 'group', 'post', 'text', 'image',
+    'pub_date', 'created',
+)
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def export_rows(author, chunk_size=EXPORT_CHUNK_SIZE):
+    """Посты и комментарии автора в формате import_data.
+
+    Строки читаются через values().iterator(), поэтому память не зависит
+    от объёма истории автора.
+    """
+    posts = Post.objects.filter(author=author).order_by('pk').values(
+        'id', 'group__slug', 'text', 'image', 'pub_date'
+    )
+    for row in posts.iterator(chunk_size=chunk_size):
+        yield {
+            'type': 'post',
+            'id': row['id'],
+            'author': author.username,
+            'group': row['group__slug'],
+            'text': row['text'],
+            'image': row['image'],
+            'pub_date': row['pub_date'],
+        }
+    comments = Comment.objects.filter(author=author).order_by('pk').values(
+        'id', 'post_id', 'text', 'created'
+    )
+    for row in comments.iterator(chunk_size=chunk_size):
+        yield {
+            'type': 'comment',
+            'id': row['id'],
+            'author': author.username,
+            'post': row['post_id'],
+            'text': row['text'],
+            'created': row['created'],
+        }
+
+
+def as_ndjson(rows):
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False, cls=DjangoJSONEncoder) + '\n'
+
+
+class _Echo:
+    """Псевдофайл для csv.writer: возвращает строку вместо записи."""
+
+    def write(self, value):
+        return value
+
+
+def as_csv(rows):
+    writer = csv.DictWriter(_Echo(), fieldnames=CSV_COLUMNS)
+    yield writer.writeheader()
+    for row in rows:
+        yield writer.writerow({
+            key: value.isoformat() if hasattr(value, 'isoformat') else value
+            for key, value in row.items()
+        })
+
+
+def render(rows, fmt):
+    return as_csv(rows) if fmt == 'csv' else as_ndjson(rows)
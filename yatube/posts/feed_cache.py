@@ -0,0 +1,24 @@
+import time
+
+from django.core.cache import cache
+
+FEED_VERSION_KEY = 'posts:feed_version'
+
+
+def feed_version():
+    """Текущее поколение кэша лент; входит в ключи фрагментов."""
+    return cache.get_or_set(FEED_VERSION_KEY, _new_version, None)
+
+
+def bump_feed_version():
+    """Делает все закэшированные фрагменты лент устаревшими."""
+    try:
+        cache.incr(FEED_VERSION_KEY)
+    except ValueError:
+        cache.set(FEED_VERSION_KEY, _new_version(), None)
+
+
+def _new_version():
+    # Счётчик мог быть вытеснен из кэша: начинаем с метки времени,
+    # чтобы не вернуться к номеру, под которым лежат старые фрагменты.
+    return int(time.time() * 1000)
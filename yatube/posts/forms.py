@@ -1,5 +1,8 @@
 from django import forms
+from django.core.files.uploadedfile import UploadedFile
+from PIL import Image
 
+from .images import normalize
 from .models import Comment, Post
 
 
@@ -16,6 +19,20 @@ class PostForm(forms.ModelForm):
             'group': 'Группа поста'
         }
 
+    def clean_image(self):
+        image = self.cleaned_data.get('image')
+        if isinstance(image, UploadedFile):
+            # verify() ImageField не декодирует пиксели: обрезанный файл
+            # или «бомба» распаковки падают только при пережатии.
+            try:
+                return normalize(image)
+            except (OSError, ValueError, Image.DecompressionBombError):
+                raise forms.ValidationError(
+                    self.fields['image'].error_messages['invalid_image'],
+                    code='invalid_image'
+                )
+        return image
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
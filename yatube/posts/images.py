@@ -0,0 +1,88 @@
+import hashlib
+import os
+import re
+import tempfile
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+from PIL import Image, ImageOps
+
+# Имя файла, выданное normalize(): sha256 содержимого и расширение.
+CONTENT_NAME = re.compile(r'^[0-9a-f]{64}\.(jpg|png)$')
+
+
+def has_alpha(image):
+    if image.mode in ('RGBA', 'LA', 'PA'):
+        return image.getextrema()[-1][0] < 255
+    return image.mode == 'P' and 'transparency' in image.info
+
+
+def normalize(upload):
+    """Пережимает загруженную картинку и называет её по хешу содержимого.
+
+    Размер ограничивается IMAGE_MAX_SIZE, ориентация из EXIF
+    применяется к пикселям, а сами метаданные при пересохранении
+    не переносятся. Прозрачные картинки сохраняются в PNG,
+    остальные — в JPEG.
+    """
+    upload.seek(0)
+    image = Image.open(upload)
+    max_size = (settings.IMAGE_MAX_SIZE, settings.IMAGE_MAX_SIZE)
+    # Для JPEG декодер сразу уменьшает картинку в 2–8 раз.
+    image.draft('RGB', max_size)
+    image = ImageOps.exif_transpose(image)
+    image.thumbnail(max_size, Image.LANCZOS)
+
+    buffer = BytesIO()
+    if has_alpha(image):
+        ext = 'png'
+        image.convert('RGBA').save(buffer, 'PNG', optimize=True)
+    else:
+        ext = 'jpg'
+        image.convert('RGB').save(
+            buffer, 'JPEG', quality=settings.IMAGE_QUALITY,
+            optimize=True, progressive=True
+        )
+    content = buffer.getvalue()
+    digest = hashlib.sha256(content).hexdigest()
+    return ContentFile(content, name=f'{digest}.{ext}')
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Файлы с именем по хешу содержимого хранятся в одном экземпляре.
+
+    Повторная загрузка той же картинки возвращает уже сохранённое имя.
+    Файлы с обычными именами сохраняются как в FileSystemStorage.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        if CONTENT_NAME.match(os.path.basename(name)):
+            return name
+        return super().get_available_name(name, max_length)
+
+    def _save(self, name, content):
+        if not CONTENT_NAME.match(os.path.basename(name)):
+            return super()._save(name, content)
+        path = self.path(name)
+        if os.path.exists(path):
+            return name
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        # Запись во временный файл и os.replace: параллельная загрузка
+        # того же файла заменит его идентичным содержимым.
+        fd, temp = tempfile.mkstemp(dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                for chunk in content.chunks():
+                    file.write(chunk)
+            os.chmod(temp, self.file_permissions_mode or 0o644)
+            os.replace(temp, path)
+        except BaseException:
+            if os.path.exists(temp):
+                os.remove(temp)
+            raise
+        return name
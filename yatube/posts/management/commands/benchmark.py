@@ -0,0 +1,178 @@
+import json
+import math
+import os
+import re
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils.http import urlencode
+
+from posts import urls as posts_urls
+from posts.models import AuthorStats, Group, Post
+
+DEFAULT_BASELINE = os.path.join(settings.BASE_DIR, 'benchmark_baseline.json')
+
+
+def percentile(values, percent):
+    """Перцентиль по методу ближайшего ранга."""
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+class Command(BaseCommand):
+    help = (
+        'Прогоняет все URL из posts.urls через тестовый клиент и выводит '
+        'p50/p95/p99 задержки и число SQL-запросов; сравнивает их '
+        'с сохранённым эталоном.'
+    )
+
+    # URL, которые клиент открывает на своих собственных данных.
+    OWN_TARGETS = ('posts:post_edit', 'posts:profile_export')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests', type=int, default=50,
+            help='Сколько замеров на каждый URL.'
+        )
+        parser.add_argument(
+            '--warmup', type=int, default=3,
+            help='Сколько прогревочных запросов без замера.'
+        )
+        parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+        parser.add_argument(
+            '--save-baseline', action='store_true',
+            help='Записать результаты как новый эталон.'
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=0.25,
+            help='Допустимый рост p95 относительно эталона (доля).'
+        )
+
+    def handle(self, *args, **options):
+        # Клиент — самый подписанный автор хотя бы одного поста: так
+        # лента подписок полна, а редактирование и выгрузка замеряются
+        # на его собственных данных, а не на 302 и 403.
+        ranked = (
+            AuthorStats.objects.select_related('user')
+            .order_by('-following_count', '-posts_count')
+        )
+        stats = ranked.filter(posts_count__gt=0).first() or ranked.first()
+        if stats is None:
+            raise CommandError('База пуста: сначала запустите seed_data.')
+        self.user = stats.user
+        client = Client()
+        client.force_login(self.user)
+
+        # Запросы на запись (подписка, отписка) откатываются вместе
+        # с транзакцией, поэтому замер не меняет данные. Ограничение
+        # частоты выключено, иначе замерялись бы ответы 429.
+        with transaction.atomic(), override_settings(THROTTLE_RATES={}):
+            results = self.measure(client, options)
+            transaction.set_rollback(True)
+        self.print_table(results)
+
+        if options['save_baseline']:
+            with open(options['baseline'], 'w') as file:
+                json.dump(results, file, indent=2, ensure_ascii=False)
+            self.stdout.write(f'Эталон сохранён в {options["baseline"]}')
+        elif os.path.exists(options['baseline']):
+            with open(options['baseline']) as file:
+                self.compare(results, json.load(file), options['tolerance'])
+
+    def measure(self, client, options):
+        results = {}
+        for name, url in self.targets():
+            for _ in range(options['warmup']):
+                client.get(url)
+            timings, queries = [], []
+            for _ in range(options['requests']):
+                start = time.perf_counter()
+                response = client.get(url)
+                timings.append((time.perf_counter() - start) * 1000)
+                queries.append(response.query_count)
+            results[name] = {
+                'url': url,
+                'status': response.status_code,
+                'p50': percentile(timings, 50),
+                'p95': percentile(timings, 95),
+                'p99': percentile(timings, 99),
+                'queries': max(queries),
+            }
+        return results
+
+    def targets(self):
+        """Имя и адрес каждого URL из posts.urls с реальными аргументами.
+
+        Чтение замеряется на самом популярном посте, группе и авторе,
+        редактирование и выгрузка — на посте и профиле клиента, поиск —
+        по слову из популярного поста.
+        """
+        post = Post.objects.order_by('-comments_count', '-pk').first()
+        own_post = (
+            Post.objects.filter(author=self.user).order_by('-pk').first()
+            or post
+        )
+        group = Group.objects.order_by('-posts_count', '-pk').first()
+        author = (
+            AuthorStats.objects.select_related('user')
+            .order_by('-followers_count').first().user
+        )
+        values = {
+            'post_id': post.pk if post else 0,
+            'slug': group.slug if group else 'none',
+            'username': author.username,
+        }
+        own = {
+            'post_id': own_post.pk if own_post else 0,
+            'username': self.user.username,
+        }
+        words = re.findall(r'\w{4,}', post.text) if post else []
+        query = {'q': max(words, key=len) if words else 'пост'}
+        for pattern in posts_urls.urlpatterns:
+            name = f'{posts_urls.app_name}:{pattern.name}'
+            kwargs = {
+                key: (own if name in self.OWN_TARGETS else values)[key]
+                for key in pattern.pattern.converters
+            }
+            url = reverse(name, kwargs=kwargs)
+            if name == 'posts:search':
+                url = f'{url}?{urlencode(query)}'
+            yield name, url
+
+    def print_table(self, results):
+        self.stdout.write(
+            f'{"URL":<28}{"Код":>5}{"p50, мс":>10}{"p95, мс":>10}'
+            f'{"p99, мс":>10}{"SQL":>6}'
+        )
+        for name, row in results.items():
+            self.stdout.write(
+                f'{name:<28}{row["status"]:>5}{row["p50"]:>10.1f}'
+                f'{row["p95"]:>10.1f}{row["p99"]:>10.1f}{row["queries"]:>6}'
+            )
+
+    def compare(self, results, baseline, tolerance):
+        regressions = []
+        for name, row in results.items():
+            base = baseline.get(name)
+            if base is None:
+                continue
+            if row['p95'] > base['p95'] * (1 + tolerance):
+                regressions.append(
+                    f'{name}: p95 {row["p95"]:.1f} мс '
+                    f'против {base["p95"]:.1f} мс'
+                )
+            if row['queries'] > base['queries']:
+                regressions.append(
+                    f'{name}: {row["queries"]} SQL-запросов '
+                    f'против {base["queries"]}'
+                )
+        if regressions:
+            raise CommandError(
+                'Регрессия производительности:\n' + '\n'.join(regressions)
+            )
+        self.stdout.write(self.style.SUCCESS('Регрессий нет.'))
@@ -0,0 +1,182 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection, connections, transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from posts.models import AuthorStats, Comment, Group, Post
+
+from .benchmark import percentile
+
+# journal_mode хранится в файле базы, поэтому для замера «до» его нужно
+# вернуть явно; остальные прагмы без настройки имеют значения SQLite.
+DEFAULT_PRAGMAS = {'journal_mode': 'delete'}
+
+MARKER = 'benchmark_sqlite'
+
+
+class Scenario:
+    """Время и ошибки всех потоков одного замера."""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.deadline = time.monotonic() + seconds
+        self.reads, self.writes, self.errors = [], [], []
+
+    def running(self):
+        return time.monotonic() < self.deadline
+
+    def timed(self, timings, label, action, *args):
+        start = time.perf_counter()
+        try:
+            action(*args)
+        except DatabaseError:
+            self.errors.append(label)
+            return
+        timings.append((time.perf_counter() - start) * 1000)
+
+    def summary(self):
+        return {
+            'reads': len(self.reads) / self.seconds,
+            'read_p95': percentile(self.reads, 95) if self.reads else 0,
+            'writes': len(self.writes) / self.seconds,
+            'write_p95': percentile(self.writes, 95) if self.writes else 0,
+            'errors': len(self.errors),
+        }
+
+
+def run_threads(targets):
+    """Запускает (функция, *аргументы) в потоках и ждёт их.
+
+    Каждый поток закрывает свои соединения: иначе следующий замер
+    не сможет сменить journal_mode.
+    """
+    def run(target, *args):
+        try:
+            target(*args)
+        finally:
+            connections.close_all()
+
+    threads = [
+        threading.Thread(target=run, args=target) for target in targets
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+class Command(BaseCommand):
+    help = (
+        'Одновременно читает ленты и пишет посты и комментарии, сначала '
+        'с прагмами SQLite по умолчанию, затем с SQLITE_PRAGMAS, и '
+        'сравнивает пропускную способность. Созданные записи удаляются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--readers', type=int, default=4,
+            help='Сколько потоков читают ленты.'
+        )
+        parser.add_argument(
+            '--writers', type=int, default=2,
+            help='Сколько потоков пишут посты и комментарии.'
+        )
+        parser.add_argument(
+            '--seconds', type=float, default=5,
+            help='Длительность каждого замера.'
+        )
+
+    def handle(self, *args, readers, writers, seconds, **options):
+        if connection.vendor != 'sqlite' or connection.is_in_memory_db():
+            raise CommandError('Нужна база SQLite в файле.')
+        reader = (
+            AuthorStats.objects.select_related('user')
+            .order_by('-following_count').first()
+        )
+        writer = (
+            AuthorStats.objects.select_related('user')
+            .order_by('-followers_count').first()
+        )
+        if reader is None:
+            raise CommandError('База пуста: сначала запустите seed_data.')
+        urls = self.feed_urls(reader.user, writer.user)
+
+        try:
+            results = self.run_phases(
+                reader.user, writer.user, urls, readers, writers, seconds)
+        finally:
+            connections.close_all()
+            Post.objects.filter(text__startswith=MARKER).delete()
+        self.print_table(results)
+
+    def run_phases(self, reader, writer, urls, readers, writers, seconds):
+        """Один и тот же замер с прагмами по умолчанию и из настроек."""
+        results = {}
+        phases = (
+            ('default', DEFAULT_PRAGMAS), ('tuned', settings.SQLITE_PRAGMAS)
+        )
+        for name, pragmas in phases:
+            # Прагмы применяются при открытии соединения.
+            connections.close_all()
+            with override_settings(SQLITE_PRAGMAS=pragmas, THROTTLE_RATES={}):
+                results[name] = self.measure(
+                    reader, writer, urls, readers, writers, seconds)
+        return results
+
+    def feed_urls(self, reader, author):
+        group = Group.objects.order_by('-posts_count', '-pk').first()
+        urls = [
+            reverse('posts:index'),
+            reverse('posts:profile', args=(author.username,)),
+            reverse('posts:follow_index'),
+            reverse('posts:popular_index'),
+        ]
+        if group is not None:
+            urls.append(reverse('posts:group_list', args=(group.slug,)))
+        return urls
+
+    def measure(self, reader, writer, urls, readers, writers, seconds):
+        scenario = Scenario(seconds)
+        threads = []
+        for _ in range(readers):
+            client = Client()
+            client.force_login(reader)
+            threads.append((self.read_loop, scenario, client, urls))
+        threads += [(self.write_loop, scenario, writer)] * writers
+        run_threads(threads)
+        return scenario.summary()
+
+    def read_loop(self, scenario, client, urls):
+        step = 0
+        while scenario.running():
+            url = urls[step % len(urls)]
+            step += 1
+            scenario.timed(scenario.reads, url, client.get, url)
+
+    def write_loop(self, scenario, author):
+        step = 0
+        while scenario.running():
+            step += 1
+            scenario.timed(
+                scenario.writes, 'write', self.write_post, author, step)
+
+    @transaction.atomic
+    def write_post(self, author, step):
+        post = Post.objects.create(author=author, text=f'{MARKER} {step}')
+        Comment.objects.create(post=post, author=author, text=MARKER)
+
+    def print_table(self, results):
+        self.stdout.write(
+            f'{"Прагмы":<10}{"чтений/с":>10}{"p95, мс":>10}'
+            f'{"записей/с":>11}{"p95, мс":>10}{"ошибок":>8}'
+        )
+        for name, row in results.items():
+            self.stdout.write(
+                f'{name:<10}{row["reads"]:>10.1f}{row["read_p95"]:>10.1f}'
+                f'{row["writes"]:>11.1f}{row["write_p95"]:>10.1f}'
+                f'{row["errors"]:>8}'
+            )
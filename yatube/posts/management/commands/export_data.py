@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import export
+from posts.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково выгружает посты и комментарии пользователя в NDJSON '
+        'или CSV в формате import_data.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument(
+            '--format', choices=tuple(export.FORMATS), default='ndjson')
+        parser.add_argument(
+            '--output', default='-', help='Файл или «-» для stdout.')
+        parser.add_argument(
+            '--chunk-size', type=int, default=export.EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, username, **options):
+        author = User.objects.filter(username=username).first()
+        if author is None:
+            raise CommandError(f'Пользователь {username} не найден.')
+        chunks = export.render(
+            export.export_rows(author, options['chunk_size']),
+            options['format']
+        )
+        if options['output'] == '-':
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+        with open(options['output'], 'w', encoding='utf-8',
+                  newline='') as file:
+            file.writelines(chunks)
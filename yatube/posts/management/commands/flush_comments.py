@@ -0,0 +1,37 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts import comment_queue
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит комментарии из очереди отложенной записи в базу. '
+        'Работает в цикле: полные пачки переносятся без пауз, между '
+        'неполными — ожидание COMMENT_FLUSH_INTERVAL секунд.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float,
+            default=settings.COMMENT_FLUSH_INTERVAL,
+            help='Пауза между пачками в секундах; 0 — перенести всё '
+                 'и выйти.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.COMMENT_BATCH_SIZE,
+            help='Сколько комментариев переносить одной транзакцией.'
+        )
+
+    def handle(self, *args, interval, batch_size, **options):
+        while True:
+            flushed = comment_queue.flush(batch_size)
+            if flushed:
+                self.stdout.write(f'Перенесено комментариев: {flushed}')
+            if flushed == batch_size:
+                continue
+            if not interval:
+                return
+            time.sleep(interval)
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from posts import thumbnails
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт недостающие миниатюры для всех картинок постов, '
+        'например после импорта или для постов из админки.'
+    )
+
+    def handle(self, *args, **options):
+        images, created, failed = thumbnails.backfill(
+            Post.objects.order_by('pk'))
+        self.stdout.write(
+            f'Картинок: {images}, создано миниатюр: {created}, '
+            f'ошибок: {failed}'
+        )
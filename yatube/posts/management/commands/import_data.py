@@ -0,0 +1,328 @@
+import csv
+import json
+import os
+import sys
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts import counters, search, thumbnails, timeline
+from posts.bulk import explicit_dates, reserve_pks
+from posts.feed_cache import bump_feed_version
+from posts.follow_graph import follow_graph
+from posts.models import Comment, Follow, Group, Post, User
+
+
+def read_ndjson(stream, name):
+    for number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            yield None
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as error:
+            raise CommandError(f'{name}, строка {number}: {error.msg}.')
+        if not isinstance(record, dict):
+            raise CommandError(
+                f'{name}, строка {number}: ожидался JSON-объект.')
+        yield record
+
+
+def read_csv(stream, name):
+    for row in csv.DictReader(stream):
+        yield {key: value for key, value in row.items() if value != ''}
+
+
+def parse_date(value):
+    date = parse_datetime(value) if value else None
+    if date is None:
+        return timezone.now()
+    if timezone.is_naive(date):
+        date = timezone.make_aware(date, timezone.utc)
+    return date
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково импортирует посты, комментарии и подписки из NDJSON '
+        'или CSV (колонка type: post, comment, follow) пачками через '
+        'bulk_create и сохраняет точки возобновления.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл или «-» для stdin.')
+        parser.add_argument(
+            '--format', choices=('ndjson', 'csv'), default=None,
+            help='По умолчанию определяется по расширению файла.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Строк в одном bulk_create.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=20000,
+            help='Строк в одной транзакции.'
+        )
+        parser.add_argument(
+            '--checkpoint', default=None,
+            help='Файл прогресса; при наличии импорт продолжится с него.'
+        )
+        parser.add_argument(
+            '--create-users', action='store_true',
+            help='Создавать отсутствующих пользователей.'
+        )
+        parser.add_argument(
+            '--skip-rebuild', action='store_true',
+            help='Не пересчитывать счётчики, ленты и поиск после импорта.'
+        )
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.create_users = options['create_users']
+        self.users = {}
+        self.groups = {}
+        self.posts = {}
+        self.skipped = 0
+
+        self.checkpoint = options['checkpoint']
+        state = self.load_checkpoint()
+        done = state['line']
+
+        path = options['path']
+        if path != '-' and not os.path.exists(path):
+            raise CommandError(f'Файл {path} не найден.')
+        fmt = options['format'] or ('csv' if path.endswith('.csv')
+                                    else 'ndjson')
+        stream = (
+            sys.stdin if path == '-'
+            else open(path, encoding='utf-8', newline='')
+        )
+        reader = read_csv if fmt == 'csv' else read_ndjson
+
+        started = time.monotonic()
+        line = 0
+        chunk = []
+        try:
+            records = reader(stream, 'stdin' if path == '-' else path)
+            for line, record in enumerate(records, start=1):
+                if line <= done or record is None:
+                    continue
+                chunk.append(record)
+                if len(chunk) >= options['chunk_size']:
+                    self.import_chunk(chunk, state, line, started)
+                    chunk = []
+            if chunk:
+                self.import_chunk(chunk, state, line, started)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        if not options['skip_rebuild']:
+            self.rebuild(state)
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово: {state["imported"]} строк, пропущено {self.skipped}.'
+        ))
+
+    def load_checkpoint(self):
+        state = {
+            'line': 0, 'imported': 0,
+            'first_post': None, 'first_comment': None, 'first_follow': None,
+        }
+        if self.checkpoint and os.path.exists(self.checkpoint):
+            with open(self.checkpoint) as file:
+                state.update(json.load(file))
+            posts_map = f'{self.checkpoint}.posts'
+            if os.path.exists(posts_map):
+                with open(posts_map) as file:
+                    for row in file:
+                        external_id, pk = row.rstrip('\n').rsplit('\t', 1)
+                        self.posts[external_id] = int(pk)
+            self.stdout.write(f'Продолжаем со строки {state["line"] + 1}.')
+        return state
+
+    def save_checkpoint(self, state, new_posts):
+        if not self.checkpoint:
+            return
+        with open(f'{self.checkpoint}.posts', 'a') as file:
+            file.writelines(
+                f'{external_id}\t{pk}\n' for external_id, pk in new_posts
+            )
+        temp = f'{self.checkpoint}.tmp'
+        with open(temp, 'w') as file:
+            json.dump(state, file)
+        os.replace(temp, self.checkpoint)
+
+    def user_id(self, username):
+        if username not in self.users:
+            pk = (
+                User.objects.filter(username=username)
+                .values_list('pk', flat=True).first()
+            )
+            if pk is None and self.create_users:
+                pk = User.objects.create(username=username).pk
+            self.users[username] = pk
+        return self.users[username]
+
+    def group_id(self, slug):
+        if not slug:
+            return None
+        if slug not in self.groups:
+            self.groups[slug] = Group.objects.get_or_create(
+                slug=slug, defaults={'title': slug}
+            )[0].pk
+        return self.groups[slug]
+
+    def import_chunk(self, records, state, line, started):
+        with transaction.atomic():
+            posts, comments, follows, new_posts = self.build_chunk(
+                records, state)
+            self.bulk_insert(Post, posts, 'pub_date')
+            self.bulk_insert(Comment, comments, 'created')
+            self.insert_follows(follows)
+
+        state['line'] = line
+        state['imported'] += len(posts) + len(comments) + len(follows)
+        self.save_checkpoint(state, new_posts)
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f'строка {line}: постов {len(posts)}, комментариев '
+            f'{len(comments)}, подписок {len(follows)}; всего '
+            f'{state["imported"]}, {state["imported"] / elapsed:.0f} строк/с'
+        )
+
+    def build_chunk(self, records, state):
+        """Объекты пачки; pk постов и комментариев занимаются заранее.
+
+        В Django 2.2 bulk_create на SQLite не возвращает pk, а на посты
+        ссылаются комментарии той же пачки. Пропущенные строки оставляют
+        пропуски в занятом блоке. Первые pk импорта запоминаются: по ним
+        rebuild находит всё, что импорт добавил.
+        """
+        kinds = Counter(record.get('type') for record in records)
+        next_post = reserve_pks(Post, kinds['post'])
+        next_comment = reserve_pks(Comment, kinds['comment'])
+        if state['first_post'] is None:
+            state['first_post'] = next_post
+        if state['first_comment'] is None:
+            state['first_comment'] = next_comment
+        if state['first_follow'] is None:
+            state['first_follow'] = reserve_pks(Follow, 0)
+
+        posts, comments, follows, new_posts = [], [], [], []
+        for record in records:
+            kind = record.get('type')
+            if kind == 'post':
+                post = self.build_post(record, next_post)
+                next_post += 1
+                if post is not None:
+                    posts.append(post)
+                    new_posts.extend(self.remember_post(record, post))
+            elif kind == 'comment':
+                comments.append(self.build_comment(record, next_comment))
+                next_comment += 1
+            elif kind == 'follow':
+                follows.append(self.build_follow(record))
+            else:
+                self.skipped += 1
+        comments = [comment for comment in comments if comment is not None]
+        follows = [follow for follow in follows if follow is not None]
+        return posts, comments, follows, new_posts
+
+    def remember_post(self, record, post):
+        """Связь внешнего id с pk для комментариев и точки возобновления."""
+        if not record.get('id'):
+            return []
+        self.posts[str(record['id'])] = post.pk
+        return [(str(record['id']), post.pk)]
+
+    def insert_follows(self, follows):
+        for start in range(0, len(follows), self.batch_size):
+            Follow.objects.bulk_create(
+                follows[start:start + self.batch_size],
+                ignore_conflicts=True
+            )
+        for user_id in {follow.user_id for follow in follows}:
+            follow_graph.forget(user_id)
+
+    def bulk_insert(self, model, objects, date_field):
+        """bulk_create пачками с сохранением исходных дат."""
+        with explicit_dates(model, date_field):
+            for start in range(0, len(objects), self.batch_size):
+                model.objects.bulk_create(
+                    objects[start:start + self.batch_size])
+
+    def build_post(self, record, pk):
+        author_id = self.user_id(record.get('author'))
+        if author_id is None or not record.get('text'):
+            self.skipped += 1
+            return None
+        return Post(
+            pk=pk,
+            author_id=author_id,
+            group_id=self.group_id(record.get('group')),
+            text=record['text'],
+            image=record.get('image', ''),
+            pub_date=parse_date(record.get('pub_date')),
+        )
+
+    def build_comment(self, record, pk):
+        author_id = self.user_id(record.get('author'))
+        post_id = self.posts.get(str(record.get('post')))
+        if author_id is None or post_id is None or not record.get('text'):
+            self.skipped += 1
+            return None
+        return Comment(
+            pk=pk,
+            post_id=post_id,
+            author_id=author_id,
+            text=record['text'],
+            created=parse_date(record.get('created')),
+        )
+
+    def build_follow(self, record):
+        user_id = self.user_id(record.get('user'))
+        author_id = self.user_id(record.get('author'))
+        if None in (user_id, author_id) or user_id == author_id:
+            self.skipped += 1
+            return None
+        return Follow(user_id=user_id, author_id=author_id)
+
+    def rebuild(self, state):
+        """Пересчитывает только то, что затронул импорт."""
+        if state['first_post'] is None:
+            return
+        self.stdout.write('Пересчёт счётчиков, лент и поиска...')
+        posts = Post.objects.filter(pk__gte=state['first_post'])
+        comments = Comment.objects.filter(pk__gte=state['first_comment'])
+        follows = Follow.objects.filter(pk__gte=state['first_follow'])
+        authors = posts.values('author_id')
+        counters.recount_authors(
+            User.objects.filter(
+                Q(pk__in=authors)
+                | Q(pk__in=follows.values('user_id'))
+                | Q(pk__in=follows.values('author_id'))
+            ),
+            self.batch_size
+        )
+        counters.recount_groups(
+            Group.objects.filter(pk__in=posts.values('group_id')),
+            self.batch_size
+        )
+        counters.recount_posts(
+            Post.objects.filter(pk__in=comments.values('post_id')),
+            self.batch_size
+        )
+        timeline.rebuild(
+            Follow.objects.filter(
+                Q(author_id__in=authors) | Q(pk__gte=state['first_follow'])
+            ).values_list('user_id', flat=True).distinct()
+        )
+        search.reindex(posts, comments, self.batch_size)
+        thumbnails.backfill(posts)
+        bump_feed_version()
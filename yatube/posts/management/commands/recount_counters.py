@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from posts import counters
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает счётчики постов, комментариев и подписок '
+        'и исправляет расхождения.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Сколько строк обновлять за один запрос.'
+        )
+
+    def handle(self, *args, batch_size, **options):
+        for name, recount in (
+            ('авторы', counters.recount_authors),
+            ('группы', counters.recount_groups),
+            ('посты', counters.recount_posts),
+        ):
+            fixed = recount(batch_size=batch_size)
+            self.stdout.write(f'{name}: исправлено строк — {fixed}')
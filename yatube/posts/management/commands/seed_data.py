@@ -0,0 +1,205 @@
+import random
+from itertools import accumulate
+from io import BytesIO
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from faker import Faker
+from PIL import Image
+
+from posts import counters, search, timeline
+from posts.feed_cache import bump_feed_version
+from posts.images import normalize
+from posts.models import Comment, Follow, Group, Post, User
+
+SEED_PASSWORD = 'seed-password'
+
+
+def zipf_weights(count, exponent):
+    """Веса степенного распределения: первый элемент самый популярный."""
+    return [1 / (rank ** exponent) for rank in range(1, count + 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу синтетическими данными заданного масштаба: '
+        'пользователи, группы, посты с картинками, комментарии и граф '
+        'подписок со степенным распределением.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--groups', type=int, default=10)
+        parser.add_argument('--posts', type=int, default=1000)
+        parser.add_argument('--comments', type=int, default=3000)
+        parser.add_argument(
+            '--follows', type=int, default=20,
+            help='Сколько авторов в среднем читает пользователь.'
+        )
+        parser.add_argument(
+            '--images', type=int, default=5,
+            help='Сколько разных картинок сгенерировать.'
+        )
+        parser.add_argument(
+            '--image-ratio', type=float, default=0.2,
+            help='Доля постов с картинкой.'
+        )
+        parser.add_argument(
+            '--exponent', type=float, default=1.1,
+            help='Показатель степенного распределения популярности.'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        self.faker = Faker('ru_RU')
+        if options['seed'] is not None:
+            self.faker.seed_instance(options['seed'])
+        self.batch_size = options['batch_size']
+        self.exponent = options['exponent']
+
+        with transaction.atomic():
+            users = self.create_users(options['users'])
+            groups = self.create_groups(options['groups'])
+            images = self.create_images(options['images'])
+            posts = self.create_posts(
+                options['posts'], users, groups, images,
+                options['image_ratio']
+            )
+            self.create_comments(options['comments'], users, posts)
+            self.create_follows(options['follows'], users)
+
+            self.stdout.write('Пересчёт счётчиков, лент и поиска...')
+            counters.recount_authors(
+                User.objects.filter(pk__in=users), self.batch_size)
+            counters.recount_groups(batch_size=self.batch_size)
+            counters.recount_posts(batch_size=self.batch_size)
+            timeline.rebuild(users)
+            search.reindex(
+                Post.objects.filter(pk__in=posts),
+                Comment.objects.filter(post_id__in=posts),
+                self.batch_size
+            )
+        bump_feed_version()
+        self.stdout.write(self.style.SUCCESS('Готово.'))
+
+    def report(self, name, count):
+        self.stdout.write(f'{name}: {count}')
+
+    def create_users(self, count):
+        password = make_password(SEED_PASSWORD)
+        prefix = self.faker.unique.user_name()
+        User.objects.bulk_create(
+            (
+                User(
+                    username=f'{prefix}_{i}',
+                    first_name=self.faker.first_name(),
+                    last_name=self.faker.last_name(),
+                    email=self.faker.email(),
+                    password=password,
+                )
+                for i in range(count)
+            )
+        )
+        self.report('пользователи', count)
+        return list(
+            User.objects.filter(username__startswith=f'{prefix}_')
+            .order_by('pk').values_list('pk', flat=True)
+        )
+
+    def create_groups(self, count):
+        prefix = self.faker.unique.slug()
+        Group.objects.bulk_create(
+            Group(
+                title=self.faker.catch_phrase(),
+                slug=f'{prefix}-{i}',
+                description=self.faker.paragraph(),
+            )
+            for i in range(count)
+        )
+        self.report('группы', count)
+        return list(
+            Group.objects.filter(slug__startswith=f'{prefix}-')
+            .values_list('pk', flat=True)
+        )
+
+    def create_images(self, count):
+        storage = Post._meta.get_field('image').storage
+        names = []
+        for i in range(count):
+            color = tuple(self.random.randrange(256) for _ in range(3))
+            buffer = BytesIO()
+            Image.new('RGB', (1280, 720), color).save(buffer, 'JPEG')
+            image = normalize(buffer)
+            names.append(storage.save(f'posts/{image.name}', image))
+        self.report('картинки', count)
+        return names
+
+    def create_posts(self, count, users, groups, images, image_ratio):
+        authors = self.random.choices(
+            users, zipf_weights(len(users), self.exponent), k=count)
+        for start in range(0, count, self.batch_size):
+            Post.objects.bulk_create([
+                Post(
+                    author_id=author_id,
+                    group_id=(
+                        self.random.choice(groups)
+                        if groups and self.random.random() < 0.7 else None
+                    ),
+                    text=self.faker.text(max_nb_chars=600),
+                    image=(
+                        self.random.choice(images)
+                        if images and self.random.random() < image_ratio
+                        else ''
+                    ),
+                )
+                for author_id in authors[start:start + self.batch_size]
+            ])
+        self.report('посты', count)
+        return list(
+            Post.objects.filter(author_id__in=users)
+            .values_list('pk', flat=True)
+        )
+
+    def create_comments(self, count, users, posts):
+        if not posts:
+            return
+        targets = self.random.choices(
+            posts, zipf_weights(len(posts), self.exponent), k=count)
+        Comment.objects.bulk_create(
+            (
+                Comment(
+                    post_id=post_id,
+                    author_id=self.random.choice(users),
+                    text=self.faker.sentence(nb_words=12),
+                )
+                for post_id in targets
+            )
+        )
+        self.report('комментарии', count)
+
+    def create_follows(self, average, users):
+        cum_weights = list(
+            accumulate(zipf_weights(len(users), self.exponent)))
+        follows = []
+        for user_id in users:
+            # Распределение Парето со средним average, не больше половины
+            # пользователей, чтобы выборка без повторов быстро сходилась.
+            wanted = min(
+                int(self.random.paretovariate(2) * average / 2),
+                (len(users) - 1) // 2
+            )
+            authors = set()
+            while len(authors) < wanted:
+                author_id = self.random.choices(
+                    users, cum_weights=cum_weights)[0]
+                if author_id != user_id:
+                    authors.add(author_id)
+            follows.extend(
+                Follow(user_id=user_id, author_id=author_id)
+                for author_id in authors
+            )
+        Follow.objects.bulk_create(follows, ignore_conflicts=True)
+        self.report('подписки', len(follows))
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts import popular
+
+
+class Command(BaseCommand):
+    help = (
+        'Инкрементально пересчитывает рейтинг популярных постов. '
+        'Запускается по расписанию или с --interval в цикле.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=int, default=0,
+            help='Повторять каждые N секунд; 0 — один запуск.'
+        )
+
+    def handle(self, *args, interval, **options):
+        while True:
+            started = time.monotonic()
+            size = popular.update_ranking()
+            self.stdout.write(
+                f'В рейтинге {size} постов, '
+                f'{time.monotonic() - started:.2f} с'
+            )
+            if not interval:
+                return
+            time.sleep(interval)
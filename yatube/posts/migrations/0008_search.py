@@ -0,0 +1,63 @@
+# Generated by Django 2.2.16 on 2026-10-18 17:21
+
+from django.db import migrations, models
+
+import posts.search
+
+CREATE_SEARCH_TABLE = '''
+CREATE VIRTUAL TABLE posts_search USING fts5(
+    body,
+    kind UNINDEXED,
+    object_id UNINDEXED,
+    post_id UNINDEXED,
+    tokenize = 'unicode61 remove_diacritics 2'
+)
+'''
+
+
+def fill_search(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Comment = apps.get_model('posts', 'Comment')
+    rows = [
+        (posts.search.post_rowid(pk), posts.search.normalize(text),
+         'post', pk, pk)
+        for pk, text in Post.objects.values_list('pk', 'text').iterator()
+    ] + [
+        (posts.search.comment_rowid(pk), posts.search.normalize(text),
+         'comment', pk, post_id)
+        for pk, text, post_id in Comment.objects.values_list(
+            'pk', 'text', 'post_id').iterator()
+    ]
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            'INSERT INTO posts_search (rowid, body, kind, object_id, post_id) '
+            'VALUES (%s, %s, %s, %s, %s)',
+            rows
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0007_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchEntry',
+            fields=[
+                ('id', models.IntegerField(db_column='rowid', primary_key=True, serialize=False)),
+                ('body', posts.search.SearchField()),
+                ('kind', models.CharField(max_length=10)),
+                ('object_id', models.IntegerField()),
+                ('post_id', models.IntegerField()),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'posts_search',
+                'managed': False,
+            },
+        ),
+        migrations.RunSQL(CREATE_SEARCH_TABLE, 'DROP TABLE posts_search'),
+        migrations.RunPython(fill_search, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 2.2.16 on 2026-10-18 17:35
+
+from django.db import migrations, models
+import posts.images
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0008_search'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, storage=posts.images.ContentAddressedStorage(), upload_to='posts/', verbose_name='Картинка'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 2.2.16 on 2026-10-18 17:41
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0009_image_storage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PopularPost',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='popularity', serialize=False, to='posts.Post')),
+                ('score', models.FloatField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RankingCheckpoint',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_comment_id', models.PositiveIntegerField(default=0)),
+                ('last_follow_id', models.PositiveIntegerField(default=0)),
+                ('computed_at', models.DateTimeField(null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='popularpost',
+            index=models.Index(fields=['-score', '-post'], name='posts_popular_score_idx'),
+        ),
+    ]
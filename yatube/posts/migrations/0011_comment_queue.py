@@ -0,0 +1,21 @@
+# Generated by Django 2.2.16 on 2026-10-18 17:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_popular'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommentQueueCheckpoint',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('queue', models.CharField(max_length=36, unique=True)),
+                ('last_id', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+    ]
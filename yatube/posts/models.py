@@ -1,8 +1,27 @@
 from django.contrib.auth import get_user_model
 from django.db import models
 
+from .images import ContentAddressedStorage
+from .search import SearchField
+
 User = get_user_model()
 
+# Колонки, которые карточки лент не выводят.
+FEED_DEFERRED = ('author__password', 'group__description')
+
+
+class PostQuerySet(models.QuerySet):
+    def for_feed(self):
+        """Посты для лент и страницы поста: автор и группа одним JOIN."""
+        return self.select_related('author', 'group').defer(*FEED_DEFERRED)
+
+
+class CommentQuerySet(models.QuerySet):
+    def for_post(self, post):
+        return self.filter(post=post).select_related('author').order_by(
+            'created', 'pk'
+        )
+
 
 class Post(models.Model):
     text = models.TextField(
@@ -26,11 +45,29 @@ class Post(models.Model):
     image = models.ImageField(
         'Картинка',
         upload_to='posts/',
+        storage=ContentAddressedStorage(),
         blank=True
     )
+    comments_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(
+                fields=('-pub_date', '-id'),
+                name='posts_post_date_idx'
+            ),
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='posts_post_author_date_idx'
+            ),
+            models.Index(
+                fields=('group', '-pub_date', '-id'),
+                name='posts_post_group_date_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.text[:15]
@@ -42,6 +79,7 @@ class Group(models.Model):
     description = models.TextField(
         null=True
     )
+    posts_count = models.PositiveIntegerField(default=0, editable=False)
 
     def __str__(self):
         return self.title
@@ -67,6 +105,16 @@ class Comment(models.Model):
         verbose_name='Дата комментария'
     )
 
+    objects = CommentQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=('post', 'created'),
+                name='posts_comment_post_date_idx'
+            ),
+        ]
+
 
 class Follow(models.Model):
     user = models.ForeignKey(
@@ -79,3 +127,109 @@ class Follow(models.Model):
         on_delete=models.CASCADE,
         related_name='following'
     )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=('user', 'author'),
+                name='%(app_label)s_%(class)s_unique_relationships'
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=('author', 'user'),
+                name='posts_follow_author_user_idx'
+            ),
+        ]
+
+
+class TimelineEntry(models.Model):
+    """Пост в ленте подписчика, записывается при публикации поста."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries'
+    )
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=('user', 'post'),
+                name='%(app_label)s_%(class)s_unique_entry'
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=('user', '-pub_date', '-post'),
+                name='posts_timeline_user_date_idx'
+            ),
+        ]
+
+
+class AuthorStats(models.Model):
+    """Счётчики пользователя, обновляются вместе с постами и подписками."""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats'
+    )
+    posts_count = models.PositiveIntegerField(default=0)
+    followers_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
+
+
+class PopularPost(models.Model):
+    """Строка рейтинга популярных постов, её пересчитывает update_popular."""
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='popularity'
+    )
+    score = models.FloatField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=('-score', '-post'),
+                name='posts_popular_score_idx'
+            ),
+        ]
+
+
+class RankingCheckpoint(models.Model):
+    """Докуда update_popular уже учёл комментарии и подписки."""
+    last_comment_id = models.PositiveIntegerField(default=0)
+    last_follow_id = models.PositiveIntegerField(default=0)
+    computed_at = models.DateTimeField(null=True)
+
+
+class CommentQueueCheckpoint(models.Model):
+    """Номер последней записи файла очереди, перенесённой flush_comments."""
+    queue = models.CharField(max_length=36, unique=True)
+    last_id = models.PositiveIntegerField(default=0)
+
+
+class SearchEntry(models.Model):
+    """Строка полнотекстового индекса SQLite FTS5 по постам и комментариям.
+
+    Таблица создаётся миграцией и заполняется сигналами, rank — скрытая
+    колонка FTS5 с оценкой bm25.
+    """
+    id = models.IntegerField(primary_key=True, db_column='rowid')
+    body = SearchField()
+    kind = models.CharField(max_length=10)
+    object_id = models.IntegerField()
+    post_id = models.IntegerField()
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'posts_search'
@@ -0,0 +1,105 @@
+"""Рейтинг популярных постов.
+
+Оценка поста — сумма его событий (комментариев к нему и подписок на
+автора), каждое затухает с периодом полураспада POPULAR_HALF_LIFE.
+Окно POPULAR_WINDOW ограничивает посты, а не события: в рейтинг
+попадают только посты, опубликованные за окно, а учтённые события из
+оценки не вычитаются, только затухают. Событие, которое к первому
+учёту уже старше окна, не засчитывается. Экспоненциальное затухание
+позволяет считать рейтинг инкрементально: на каждом запуске старые
+оценки умножаются на общий множитель, а добавляются только события,
+появившиеся после прошлого запуска.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Max
+from django.utils import timezone
+
+from .models import (FEED_DEFERRED, Comment, Follow, PopularPost, Post,
+                     RankingCheckpoint)
+
+POPULAR_KEYS = ('-score', '-post_id')
+
+COMMENT_WEIGHT = 1.0
+# Подписка на автора поднимает все его посты из окна.
+FOLLOW_WEIGHT = 2.0
+
+# Строки с меньшей оценкой удаляются из рейтинга.
+MIN_SCORE = 0.01
+
+
+def decay(seconds):
+    return 0.5 ** (seconds / settings.POPULAR_HALF_LIFE)
+
+
+def popular_feed():
+    """Посты рейтинга для пагинации по POPULAR_KEYS."""
+    return PopularPost.objects.select_related(
+        'post__author', 'post__group'
+    ).defer(*[f'post__{field}' for field in FEED_DEFERRED])
+
+
+@transaction.atomic
+def update_ranking(now=None):
+    """Учитывает новые события и возвращает число строк рейтинга."""
+    now = now or timezone.now()
+    cutoff = now - timedelta(seconds=settings.POPULAR_WINDOW)
+    state, _ = RankingCheckpoint.objects.select_for_update().get_or_create(
+        pk=1
+    )
+    top_follow = Follow.objects.aggregate(top=Max('pk'))['top'] or 0
+    if state.computed_at is None:
+        # Время подписок не хранится, поэтому на первом запуске старые
+        # подписки не учитываются: окно для них начинается сейчас.
+        state.last_follow_id = top_follow
+    else:
+        elapsed = (now - state.computed_at).total_seconds()
+        PopularPost.objects.update(score=F('score') * decay(elapsed))
+
+    gained = defaultdict(float)
+    comments = Comment.objects.filter(
+        pk__gt=state.last_comment_id, created__gte=cutoff
+    ).values_list('pk', 'post_id', 'created')
+    for pk, post_id, created in comments.iterator():
+        age = (now - created).total_seconds()
+        gained[post_id] += COMMENT_WEIGHT * decay(age)
+        state.last_comment_id = max(state.last_comment_id, pk)
+
+    follows = dict(
+        Follow.objects.filter(
+            pk__gt=state.last_follow_id, pk__lte=top_follow
+        ).values_list('author_id').annotate(count=Count('pk'))
+    )
+    if follows:
+        posts = Post.objects.filter(
+            author_id__in=follows, pub_date__gte=cutoff
+        ).values_list('pk', 'author_id')
+        for post_id, author_id in posts.iterator():
+            gained[post_id] += FOLLOW_WEIGHT * follows[author_id]
+    state.last_follow_id = top_follow
+
+    ranked = PopularPost.objects.in_bulk(list(gained))
+    for post_id, score in gained.items():
+        if post_id in ranked:
+            ranked[post_id].score += score
+    PopularPost.objects.bulk_update(ranked.values(), ['score'])
+    PopularPost.objects.bulk_create(
+        PopularPost(post_id=post_id, score=score)
+        for post_id, score in gained.items() if post_id not in ranked
+    )
+
+    PopularPost.objects.filter(score__lt=MIN_SCORE).delete()
+    PopularPost.objects.filter(post__pub_date__lt=cutoff).delete()
+    stale = list(
+        PopularPost.objects.order_by(*POPULAR_KEYS)
+        .values_list('pk', flat=True)[settings.POPULAR_SIZE:]
+    )
+    if stale:
+        PopularPost.objects.filter(pk__in=stale).delete()
+
+    state.computed_at = now
+    state.save()
+    return PopularPost.objects.count()
@@ -0,0 +1,134 @@
+import re
+from itertools import chain, islice
+
+from django.db import connection, models
+from django.db.models import Lookup
+
+SEARCH_TABLE = 'posts_search'
+SEARCH_KEYS = ('rank', 'pk')
+
+WORD = re.compile(r'\w+')
+CYRILLIC = re.compile(r'[а-я]+')
+
+# Окончания русских слов от длинных к коротким: отрезаем первое
+# подошедшее, то есть самое длинное, чтобы «постами», «посты» и «пост»
+# давали одну основу.
+ENDINGS = (
+    'иями', 'ями', 'ами', 'ией', 'иям', 'ием', 'иях', 'ого', 'его', 'ому',
+    'ему', 'ыми', 'ими', 'ешь', 'ишь', 'ете', 'ите', 'ая', 'яя', 'ое', 'ее',
+    'ые', 'ие', 'ый', 'ий', 'ой', 'ей', 'ую', 'юю', 'ом', 'ем', 'ам', 'ям',
+    'ах', 'ях', 'ов', 'ев', 'ия', 'ью', 'ть', 'ти', 'ет', 'ит', 'ут', 'ют',
+    'ат', 'ят', 'им', 'ла', 'ло', 'ли', 'ал', 'ял', 'ил', 'ся', 'сь', 'а', 'я',
+    'о', 'е', 'ы', 'и', 'у', 'ю', 'ь', 'й',
+)
+MIN_STEM = 3
+
+
+def stem(word):
+    """Лёгкий стеммер: нижний регистр, ё → е и отсечение окончания."""
+    word = word.lower().replace('ё', 'е')
+    if not CYRILLIC.fullmatch(word):
+        return word
+    for ending in ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= MIN_STEM:
+            return word[:-len(ending)]
+    return word
+
+
+def normalize(text):
+    """Текст для индекса: каждое слово заменено основой."""
+    return ' '.join(stem(word) for word in WORD.findall(text))
+
+
+def build_query(text):
+    """Запрос FTS5: все основы обязательны и ищутся как префиксы.
+
+    Слова берутся в кавычки, поэтому синтаксис FTS5 из ввода
+    пользователя не интерпретируется.
+    """
+    return ' '.join(f'"{stem(word)}"*' for word in WORD.findall(text))
+
+
+class SearchField(models.TextField):
+    """Текстовая колонка FTS5 с поиском через lookup match."""
+
+
+@SearchField.register_lookup
+class Match(Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', lhs_params + rhs_params
+
+
+def post_rowid(post_id):
+    return post_id * 2
+
+
+def comment_rowid(comment_id):
+    return comment_id * 2 + 1
+
+
+def bulk_index(rows):
+    """Добавляет в индекс строки (rowid, текст, вид, id объекта, id поста)."""
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT OR REPLACE INTO {SEARCH_TABLE} '
+            '(rowid, body, kind, object_id, post_id) '
+            'VALUES (%s, %s, %s, %s, %s)',
+            [
+                (rowid, normalize(text), kind, object_id, post_id)
+                for rowid, text, kind, object_id, post_id in rows
+            ]
+        )
+
+
+def index(rowid, text, kind, object_id, post_id):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [rowid]
+        )
+        cursor.execute(
+            f'INSERT INTO {SEARCH_TABLE} '
+            '(rowid, body, kind, object_id, post_id) '
+            'VALUES (%s, %s, %s, %s, %s)',
+            [rowid, normalize(text), kind, object_id, post_id]
+        )
+
+
+def unindex(rowid):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [rowid]
+        )
+
+
+def index_post(post):
+    index(post_rowid(post.pk), post.text, 'post', post.pk, post.pk)
+
+
+def index_comment(comment):
+    index(comment_rowid(comment.pk), comment.text, 'comment',
+          comment.pk, comment.post_id)
+
+
+def reindex(posts, comments, batch_size=1000):
+    """Индексирует посты и комментарии из querysets пачками."""
+    rows = chain(
+        (
+            (post_rowid(pk), text, 'post', pk, pk)
+            for pk, text in posts.values_list('pk', 'text').iterator()
+        ),
+        (
+            (comment_rowid(pk), text, 'comment', pk, post_id)
+            for pk, text, post_id in comments.values_list(
+                'pk', 'text', 'post_id').iterator()
+        ),
+    )
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        bulk_index(batch)
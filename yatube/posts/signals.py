@@ -0,0 +1,122 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import counters, search, timeline
+from .feed_cache import bump_feed_version
+from .follow_graph import follow_graph
+from .models import AuthorStats, Comment, Follow, Group, Post, User
+
+
+@receiver(post_save, sender=Post)
+def post_created(sender, instance, created, **kwargs):
+    if created:
+        timeline.fan_out(instance)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def feed_changed(sender, **kwargs):
+    bump_feed_version()
+
+
+# Поля пользователя, которые выводятся в лентах и на странице поста.
+AUTHOR_FIELDS = {'username', 'first_name', 'last_name'}
+
+
+@receiver(post_save, sender=User)
+def author_changed(sender, instance, created, update_fields=None, **kwargs):
+    # Вход сохраняет только last_login, такие сохранения ленты не трогают.
+    if not created and (
+        update_fields is None or AUTHOR_FIELDS & set(update_fields)
+    ):
+        bump_feed_version()
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, **kwargs):
+    if created:
+        follow_graph.forget(instance.user_id)
+        timeline.backfill(instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    follow_graph.forget(instance.user_id)
+    timeline.remove(instance.user_id, instance.author_id)
+
+
+@receiver(post_save, sender=User)
+def user_created(sender, instance, created, **kwargs):
+    if created:
+        AuthorStats.objects.get_or_create(user=instance)
+
+
+@receiver(pre_save, sender=Post)
+def remember_group(sender, instance, **kwargs):
+    instance._saved_group_id = (
+        Post.objects.filter(pk=instance.pk)
+        .values_list('group_id', flat=True).first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Post)
+def count_post(sender, instance, created, **kwargs):
+    if created:
+        counters.bump_author(instance.author_id, 'posts_count', 1)
+        counters.bump_group(instance.group_id, 1)
+    elif instance._saved_group_id != instance.group_id:
+        counters.bump_group(instance._saved_group_id, -1)
+        counters.bump_group(instance.group_id, 1)
+
+
+@receiver(post_delete, sender=Post)
+def uncount_post(sender, instance, **kwargs):
+    counters.bump_author(instance.author_id, 'posts_count', -1)
+    counters.bump_group(instance.group_id, -1)
+
+
+@receiver(post_save, sender=Comment)
+def count_comment(sender, instance, created, **kwargs):
+    if created:
+        counters.bump_post(instance.post_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def uncount_comment(sender, instance, **kwargs):
+    counters.bump_post(instance.post_id, -1)
+
+
+@receiver(post_save, sender=Follow)
+def count_follow(sender, instance, created, **kwargs):
+    if created:
+        counters.bump_author(instance.author_id, 'followers_count', 1)
+        counters.bump_author(instance.user_id, 'following_count', 1)
+
+
+@receiver(post_delete, sender=Follow)
+def uncount_follow(sender, instance, **kwargs):
+    counters.bump_author(instance.author_id, 'followers_count', -1)
+    counters.bump_author(instance.user_id, 'following_count', -1)
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, **kwargs):
+    search.index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    search.unindex(search.post_rowid(instance.pk))
+
+
+@receiver(post_save, sender=Comment)
+def index_comment(sender, instance, **kwargs):
+    search.index_comment(instance)
+
+
+@receiver(post_delete, sender=Comment)
+def unindex_comment(sender, instance, **kwargs):
+    search.unindex(search.comment_rowid(instance.pk))
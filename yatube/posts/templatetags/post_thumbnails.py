@@ -0,0 +1,11 @@
+from django import template
+
+from posts import thumbnails
+
+register = template.Library()
+
+
+@register.simple_tag
+def ready_thumbnail(image):
+    """Готовая миниатюра карточки или None, пока её не создал фон."""
+    return thumbnails.ready(image)
@@ -0,0 +1,104 @@
+import json
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+POSTS_COUNT = 13
+
+
+class ApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(title='Группа', slug='slug')
+        Follow.objects.create(user=cls.reader, author=cls.user)
+        cls.posts = [
+            Post.objects.create(
+                author=cls.user, text=f'Тестовый пост {i}', group=cls.group)
+            for i in range(POSTS_COUNT)
+        ]
+        cls.post = cls.posts[-1]
+        Comment.objects.create(
+            post=cls.post, author=cls.reader, text='Комментарий')
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.reader)
+
+    def get_json(self, client, url, params=None):
+        response = client.get(url, params or {})
+        self.assertEqual(response['Content-Type'], 'application/json')
+        return response, json.loads(response.content)
+
+    def test_feeds_are_paginated_by_cursor(self):
+        """Ленты API листаются курсором без пропусков."""
+        urls = (
+            (self.guest_client, reverse('posts:api_index')),
+            (self.guest_client,
+             reverse('posts:api_group_list', args=(self.group.slug,))),
+            (self.guest_client,
+             reverse('posts:api_profile', args=(self.user.username,))),
+            (self.authorized_client, reverse('posts:api_follow_index')),
+        )
+        expected = [post.pk for post in reversed(self.posts)]
+        for client, url in urls:
+            with self.subTest(url=url):
+                _, first = self.get_json(client, url, {'fields': 'id'})
+                self.assertEqual(len(first['results']), settings.POST_LIMIT)
+                _, second = self.get_json(
+                    client, url, {'fields': 'id', 'cursor': first['next']})
+                self.assertIsNone(second['next'])
+                self.assertEqual(
+                    [row['id'] for row in first['results']
+                     + second['results']],
+                    expected
+                )
+
+    def test_field_selection(self):
+        """Ответ содержит только запрошенные поля."""
+        _, data = self.get_json(
+            self.guest_client, reverse('posts:api_index'),
+            {'fields': 'text,author,unknown'}
+        )
+        self.assertEqual(
+            data['results'][0],
+            {'text': self.post.text, 'author': self.user.username}
+        )
+
+    def test_post_detail(self):
+        """Пост отдаётся вместе с первой страницей комментариев."""
+        _, data = self.get_json(
+            self.guest_client,
+            reverse('posts:api_post_detail', args=(self.post.pk,)),
+            {'comment_fields': 'author,text'}
+        )
+        self.assertEqual(data['post']['id'], self.post.pk)
+        self.assertEqual(data['post']['group'], self.group.slug)
+        self.assertIsNone(data['post']['image'])
+        self.assertEqual(
+            data['comments']['results'],
+            [{'author': self.reader.username, 'text': 'Комментарий'}]
+        )
+
+    def test_errors(self):
+        """Несуществующие объекты дают 404, лента подписок требует входа."""
+        response, _ = self.get_json(
+            self.guest_client, reverse('posts:api_post_detail', args=(0,)))
+        self.assertEqual(response.status_code, 404)
+        response, _ = self.get_json(
+            self.guest_client, reverse('posts:api_follow_index'))
+        self.assertEqual(response.status_code, 401)
+
+    def test_single_query_per_page(self):
+        """Страница ленты строится одним запросом без объектов моделей."""
+        response = self.guest_client.get(reverse('posts:api_index'))
+        self.assertEqual(response.query_count, 1)
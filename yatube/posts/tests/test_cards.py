@@ -0,0 +1,73 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.cards import card_key, render_cards
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class PostCardsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(title='Группа', slug='slug')
+        Post.objects.create(
+            author=cls.user, text='Тестовый пост', group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def get_post(self):
+        return Post.objects.for_feed().get()
+
+    def test_card_is_shared_between_feeds(self):
+        """Карточка, отрисованная в одной ленте, берётся из кэша в другой."""
+        self.guest_client.get(reverse('posts:profile', args=('auth',)))
+        post = self.get_post()
+        card = cache.get(card_key(post))
+        self.assertIn(post.text, card)
+        cache.set(card_key(post), 'Карточка из кэша')
+        response = self.guest_client.get(
+            reverse('posts:group_list', args=(self.group.slug,)))
+        self.assertContains(response, 'Карточка из кэша')
+
+    def test_key_changes_with_card_data(self):
+        """Правка, переименование автора и группы меняют ключ карточки."""
+        key = card_key(self.get_post())
+        changes = (
+            lambda: Post.objects.update(text='Новый текст'),
+            lambda: User.objects.filter(pk=self.user.pk).update(
+                first_name='Иван'),
+            lambda: Group.objects.update(title='Новая группа'),
+        )
+        for change in changes:
+            change()
+            new_key = card_key(self.get_post())
+            self.assertNotEqual(new_key, key)
+            key = new_key
+
+    def test_pending_thumbnail_is_not_cached(self):
+        """Карточка с заглушкой вместо миниатюры не кэшируется."""
+        post = self.get_post()
+        post.image.name = 'posts/missing.jpg'
+        card, = render_cards([post])
+        self.assertIn('Изображение обрабатывается', card)
+        self.assertIsNone(cache.get(card_key(post)))
+
+    def test_index_page_follows_card_changes(self):
+        """Фрагмент главной не переживает изменения карточки."""
+        url = reverse('posts:index')
+        self.guest_client.get(url)
+        author = User.objects.get(pk=self.user.pk)
+        author.username = 'renamed'
+        author.save()
+        self.assertContains(self.guest_client.get(url), 'renamed')
+        group = Group.objects.get(pk=self.group.pk)
+        group.title = 'Новое название'
+        group.save()
+        self.assertContains(self.guest_client.get(url), 'Новое название')
@@ -0,0 +1,212 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+
+from posts.bulk import reserve_pks
+from posts.models import (AuthorStats, Comment, Follow, Group, Post,
+                          SearchEntry, TimelineEntry)
+from posts.search import build_query
+from posts.urls import urlpatterns
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+User = get_user_model()
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class SeedAndBenchmarkTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        call_command(
+            'seed_data', users=8, groups=2, posts=30, comments=20,
+            follows=2, images=1, seed=1, stdout=StringIO()
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.baseline = os.path.join(TEMP_MEDIA_ROOT, 'baseline.json')
+
+    def test_seed_data(self):
+        """seed_data создаёт данные и согласованные счётчики и ленты."""
+        self.assertEqual(Post.objects.count(), 30)
+        self.assertEqual(Comment.objects.count(), 20)
+        stats = AuthorStats.objects.order_by('-posts_count').first()
+        self.assertEqual(stats.posts_count, stats.user.posts.count())
+        follow = Follow.objects.first()
+        if follow is not None:
+            self.assertTrue(
+                TimelineEntry.objects.filter(user=follow.user).exists())
+
+    def test_benchmark_covers_all_urls(self):
+        """benchmark замеряет все URL и сохраняет эталон."""
+        call_command(
+            'benchmark', requests=2, warmup=0, baseline=self.baseline,
+            save_baseline=True, stdout=StringIO()
+        )
+        with open(self.baseline) as file:
+            baseline = json.load(file)
+        self.assertEqual(
+            set(baseline),
+            {f'posts:{pattern.name}' for pattern in urlpatterns}
+        )
+        for row in baseline.values():
+            self.assertLessEqual(row['p50'], row['p99'])
+        self.assertEqual(baseline['posts:post_edit']['status'], 200)
+        self.assertEqual(baseline['posts:profile_export']['status'], 200)
+        self.assertIn('?q=', baseline['posts:search']['url'])
+        self.assertGreater(baseline['posts:search']['queries'], 0)
+
+    def test_benchmark_detects_query_regression(self):
+        """Рост числа запросов относительно эталона — ошибка."""
+        call_command(
+            'benchmark', requests=1, warmup=0, baseline=self.baseline,
+            save_baseline=True, stdout=StringIO()
+        )
+        with open(self.baseline) as file:
+            baseline = json.load(file)
+        baseline['posts:index']['queries'] = 0
+        with open(self.baseline, 'w') as file:
+            json.dump(baseline, file)
+        with self.assertRaises(CommandError):
+            call_command(
+                'benchmark', requests=1, warmup=0, baseline=self.baseline,
+                tolerance=100, stdout=StringIO()
+            )
+
+    def test_benchmark_sqlite_needs_file_database(self):
+        """benchmark_sqlite не запускается на базе в памяти."""
+        with self.assertRaises(CommandError):
+            call_command('benchmark_sqlite', stdout=StringIO())
+
+
+class ImportDataTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def write(self, name, lines):
+        path = os.path.join(self.folder, name)
+        with open(path, 'a', encoding='utf-8') as file:
+            file.writelines(f'{line}\n' for line in lines)
+        return path
+
+    def ndjson(self, *records):
+        return [json.dumps(record, ensure_ascii=False) for record in records]
+
+    def test_import_ndjson(self):
+        """NDJSON импортируется с датами, счётчиками, лентами и поиском."""
+        path = self.write('data.ndjson', self.ndjson(
+            {'type': 'post', 'id': 'p1', 'author': 'author',
+             'group': 'imported', 'text': 'Импортированный пост',
+             'pub_date': '2020-01-02T03:04:05'},
+            {'type': 'comment', 'post': 'p1', 'author': 'reader',
+             'text': 'Импортированный комментарий',
+             'created': '2020-01-03T00:00:00'},
+            {'type': 'follow', 'user': 'reader', 'author': 'author'},
+            {'type': 'comment', 'post': 'missing', 'author': 'reader',
+             'text': 'Комментарий без поста'},
+        ))
+        call_command('import_data', path, batch_size=2, stdout=StringIO())
+
+        post = Post.objects.get(text='Импортированный пост')
+        self.assertEqual(post.pub_date.year, 2020)
+        self.assertEqual(post.group.slug, 'imported')
+        self.assertEqual(post.comments_count, 1)
+        self.assertEqual(
+            Comment.objects.get(post=post).created.day, 3)
+        self.assertEqual(AuthorStats.objects.get(user=self.author)
+                         .followers_count, 1)
+        self.assertTrue(TimelineEntry.objects.filter(
+            user=self.reader, post=post).exists())
+        self.assertTrue(
+            SearchEntry.objects.filter(body__match=build_query('пост'))
+            .filter(object_id=post.pk, kind='post').exists())
+
+    def test_rebuild_touches_only_imported_rows(self):
+        """Пересчёт после импорта не трогает чужие авторов, группы и ленты."""
+        outsider = User.objects.create_user(username='outsider')
+        group = Group.objects.create(
+            title='Чужая', slug='other', posts_count=7)
+        AuthorStats.objects.filter(user=outsider).update(posts_count=7)
+        Follow.objects.create(user=outsider, author=self.reader)
+        TimelineEntry.objects.filter(user=outsider).delete()
+        Follow.objects.create(user=self.reader, author=self.author)
+        path = self.write('data.ndjson', self.ndjson(
+            {'type': 'post', 'id': 'p1', 'author': 'author',
+             'text': 'Пост для подписчика'},
+        ))
+        call_command('import_data', path, stdout=StringIO())
+
+        group.refresh_from_db()
+        self.assertEqual(group.posts_count, 7)
+        self.assertEqual(
+            AuthorStats.objects.get(user=outsider).posts_count, 7)
+        self.assertEqual(
+            AuthorStats.objects.get(user=self.author).posts_count, 1)
+        self.assertTrue(TimelineEntry.objects.filter(
+            user=self.reader, post__text='Пост для подписчика').exists())
+
+    def test_import_csv_creates_users(self):
+        """CSV с --create-users создаёт недостающих авторов."""
+        path = self.write('data.csv', [
+            'type,id,author,text',
+            'post,1,newcomer,Пост из CSV',
+        ])
+        call_command('import_data', path, create_users=True,
+                     stdout=StringIO())
+        self.assertTrue(Post.objects.filter(
+            author__username='newcomer', text='Пост из CSV').exists())
+
+    def test_resume_from_checkpoint(self):
+        """Повторный запуск с checkpoint продолжает с места остановки."""
+        checkpoint = os.path.join(self.folder, 'state.json')
+        path = self.write('data.ndjson', self.ndjson(
+            {'type': 'post', 'id': 'p1', 'author': 'author',
+             'text': 'Первый пост'},
+        ))
+        call_command('import_data', path, checkpoint=checkpoint,
+                     skip_rebuild=True, stdout=StringIO())
+        self.write('data.ndjson', self.ndjson(
+            {'type': 'comment', 'post': 'p1', 'author': 'reader',
+             'text': 'Комментарий после перезапуска'},
+        ))
+        call_command('import_data', path, checkpoint=checkpoint,
+                     skip_rebuild=True, stdout=StringIO())
+        post = Post.objects.get(text='Первый пост')
+        self.assertEqual(Post.objects.filter(text='Первый пост').count(), 1)
+        self.assertEqual(post.comments.count(), 1)
+
+    def test_malformed_line_reports_position(self):
+        """Битая строка NDJSON даёт ошибку с файлом и номером строки."""
+        path = self.write('broken.ndjson', self.ndjson(
+            {'type': 'post', 'author': 'author', 'text': 'Пост'},
+        ) + ['{"type": "post",'])
+        with self.assertRaisesMessage(CommandError, f'{path}, строка 2'):
+            call_command('import_data', path, stdout=StringIO())
+
+    def test_reserved_pks_are_not_reused(self):
+        """Обычная вставка после резерва получает pk выше блока."""
+        first = reserve_pks(Post, 5)
+        post = Post.objects.create(author=self.author, text='Живой пост')
+        self.assertGreaterEqual(post.pk, first + 5)
@@ -0,0 +1,113 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts import comment_queue
+from posts.models import Comment, Post, SearchEntry
+
+User = get_user_model()
+
+TEMP_DIR = tempfile.mkdtemp()
+
+
+@override_settings(
+    COMMENT_WRITE_BEHIND=True,
+    COMMENT_QUEUE_PATH=os.path.join(TEMP_DIR, 'queue.sqlite3'),
+)
+class CommentQueueTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.post = Post.objects.create(author=cls.author, text='Пост')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_DIR, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        comment_queue.flush()
+        self.client = Client()
+        self.client.force_login(self.reader)
+        self.url = reverse('posts:post_detail', args=(self.post.pk,))
+
+    def comment(self, text):
+        self.client.post(
+            reverse('posts:add_comment', args=(self.post.pk,)),
+            {'text': text}
+        )
+
+    def test_pending_comment_visible_to_author_only(self):
+        """Комментарий из очереди видит только его автор."""
+        self.comment('Очередной уникум')
+        self.assertFalse(Comment.objects.exists())
+        self.assertContains(self.client.get(self.url), 'Очередной уникум')
+        self.assertNotContains(Client().get(self.url), 'Очередной уникум')
+
+    def test_flush_saves_comments_once(self):
+        """Перенос создаёт комментарии, счётчик и индекс ровно один раз."""
+        self.comment('Первый перенос')
+        self.comment('Второй перенос')
+        call_command('flush_comments', interval=0, stdout=StringIO())
+        call_command('flush_comments', interval=0, stdout=StringIO())
+        self.assertEqual(
+            list(Comment.objects.values_list('text', flat=True)
+                 .order_by('pk')),
+            ['Первый перенос', 'Второй перенос']
+        )
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 2)
+        self.assertEqual(
+            SearchEntry.objects.filter(kind='comment').count(), 2)
+        response = self.client.get(self.url)
+        self.assertNotContains(response, 'data-pending')
+        self.assertContains(response, 'Первый перенос', count=1)
+
+    @override_settings(COMMENT_FLUSH_INTERVAL=5)
+    def test_flush_command_waits_by_default(self):
+        """Без --interval команда работает в цикле с паузой из настроек."""
+        self.comment('Фоновый перенос')
+        with mock.patch(
+            'posts.management.commands.flush_comments.time.sleep',
+            side_effect=KeyboardInterrupt
+        ) as sleep, self.assertRaises(KeyboardInterrupt):
+            call_command('flush_comments', stdout=StringIO())
+        sleep.assert_called_once_with(5)
+        self.assertTrue(
+            Comment.objects.filter(text='Фоновый перенос').exists())
+
+    def test_comments_to_deleted_post_are_dropped(self):
+        """Очередь не застревает на комментарии к удалённому посту."""
+        post = Post.objects.create(author=self.author, text='Удалю')
+        comment_queue.enqueue(post.pk, self.reader.pk, 'Потерянный')
+        self.comment('Живой')
+        post.delete()
+        self.assertEqual(comment_queue.flush(), 2)
+        self.assertEqual(
+            list(Comment.objects.values_list('text', flat=True)), ['Живой'])
+
+    def test_new_queue_file_starts_from_scratch(self):
+        """Отметка переноса своя у каждого файла очереди."""
+        for i in range(3):
+            self.comment(f'Старый {i}')
+        comment_queue.flush()
+        with self.settings(
+            COMMENT_QUEUE_PATH=os.path.join(TEMP_DIR, 'fresh.sqlite3')
+        ):
+            self.comment('Из нового файла')
+            self.assertEqual(comment_queue.flush(), 1)
+            self.assertEqual(
+                comment_queue.pending(self.post.pk, self.reader), [])
+        self.assertTrue(
+            Comment.objects.filter(text='Из нового файла').exists())
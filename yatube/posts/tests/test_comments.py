@@ -0,0 +1,58 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Comment, Post
+
+User = get_user_model()
+
+COMMENTS_COUNT = 5
+
+
+@override_settings(COMMENT_LIMIT=2)
+class CommentPagesTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(author=cls.user, text='Тестовый пост')
+        cls.comments = [
+            Comment.objects.create(
+                post=cls.post, author=cls.user, text=f'Комментарий {i}')
+            for i in range(COMMENTS_COUNT)
+        ]
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def test_first_page_is_bounded(self):
+        """На странице поста выводится только первая порция комментариев."""
+        response = self.guest_client.get(
+            reverse('posts:post_detail', args=(self.post.pk,)))
+        comments = response.context['comments']
+        self.assertEqual(list(comments), self.comments[:2])
+        self.assertContains(
+            response, reverse('posts:post_comments', args=(self.post.pk,)))
+
+    def test_fragment_loads_next_batches(self):
+        """Фрагмент отдаёт следующие порции без пропусков и повторов."""
+        url = reverse('posts:post_comments', args=(self.post.pk,))
+        loaded = []
+        cursor = None
+        while True:
+            response = self.guest_client.get(
+                url, {'cursor': cursor} if cursor else {})
+            self.assertLessEqual(response.query_count, 1)
+            comments = response.context['comments']
+            loaded.extend(comments)
+            cursor = comments.next_cursor
+            if cursor is None:
+                break
+        self.assertEqual(loaded, self.comments)
+        self.assertNotContains(response, 'Показать ещё')
+
+    def test_fragment_for_missing_post_is_404(self):
+        """Фрагмент комментариев несуществующего поста отдаёт 404."""
+        response = self.guest_client.get(
+            reverse('posts:post_comments', args=(self.post.pk + 100,)))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,93 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(title='Группа', slug='slug')
+        cls.post = Post.objects.create(
+            author=cls.user, text='Тестовый пост', group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.reader)
+
+    def etag(self, url):
+        # Первый ответ может выставить CSRF-cookie, которая входит в ETag.
+        self.authorized_client.get(url)
+        return self.authorized_client.get(url)['ETag']
+
+    def revalidate(self, url):
+        etag = self.etag(url)
+        return self.authorized_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_unchanged_pages_return_304(self):
+        """Неизменившиеся страницы отвечают 304 без рендеринга."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=(self.group.slug,)),
+            reverse('posts:profile', args=(self.user.username,)),
+            reverse('posts:post_detail', args=(self.post.pk,)),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.revalidate(url)
+                self.assertEqual(response.status_code, 304)
+                self.assertLessEqual(response.query_count, 3)
+
+    def test_new_post_changes_etag(self):
+        """Новый пост меняет ETag лент."""
+        url = reverse('posts:group_list', args=(self.group.slug,))
+        etag = self.etag(url)
+        Post.objects.create(
+            author=self.user, text='Ещё пост', group=self.group)
+        response = self.authorized_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_author_rename_changes_etag(self):
+        """Переименование автора меняет ETag, вход в систему — нет."""
+        url = reverse('posts:index')
+        etag = self.etag(url)
+        author = User.objects.get(pk=self.user.pk)
+        author.save(update_fields=['last_login'])
+        response = self.authorized_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        author.first_name = 'Новое имя'
+        author.save()
+        response = self.authorized_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_comment_changes_etag(self):
+        """Новый комментарий меняет ETag страницы поста."""
+        url = reverse('posts:post_detail', args=(self.post.pk,))
+        etag = self.etag(url)
+        Comment.objects.create(
+            post=self.post, author=self.reader, text='Комментарий')
+        response = self.authorized_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_follow_changes_etag(self):
+        """Подписка меняет ETag профиля для подписчика."""
+        url = reverse('posts:profile', args=(self.user.username,))
+        etag = self.etag(url)
+        Follow.objects.create(user=self.reader, author=self.user)
+        response = self.authorized_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_depends_on_user(self):
+        """Разные пользователи получают разные ETag."""
+        url = reverse('posts:index')
+        etag = self.etag(url)
+        response = Client().get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
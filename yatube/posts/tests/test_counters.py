@@ -0,0 +1,88 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from posts.models import AuthorStats, Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class CountersTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа',
+            slug='other-slug',
+        )
+
+    def stats(self, user):
+        return AuthorStats.objects.get(user=user)
+
+    def test_post_counters(self):
+        """Создание, перенос и удаление поста меняют счётчики."""
+        post = Post.objects.create(
+            author=self.user, text='Тестовый пост', group=self.group)
+        self.assertEqual(self.stats(self.user).posts_count, 1)
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 1)
+
+        post.group = self.other_group
+        post.save()
+        self.group.refresh_from_db()
+        self.other_group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 0)
+        self.assertEqual(self.other_group.posts_count, 1)
+
+        post.delete()
+        self.other_group.refresh_from_db()
+        self.assertEqual(self.stats(self.user).posts_count, 0)
+        self.assertEqual(self.other_group.posts_count, 0)
+
+    def test_comment_counter(self):
+        """Комментарии учитываются в счётчике поста."""
+        post = Post.objects.create(author=self.user, text='Тестовый пост')
+        comment = Comment.objects.create(
+            post=post, author=self.reader, text='Комментарий')
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        comment.delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 0)
+
+    def test_follow_counters(self):
+        """Подписка меняет счётчики подписчиков и подписок."""
+        Follow.objects.create(user=self.reader, author=self.user)
+        self.assertEqual(self.stats(self.user).followers_count, 1)
+        self.assertEqual(self.stats(self.reader).following_count, 1)
+        Follow.objects.filter(user=self.reader, author=self.user).delete()
+        self.assertEqual(self.stats(self.user).followers_count, 0)
+        self.assertEqual(self.stats(self.reader).following_count, 0)
+
+    def test_recount_command_repairs_drift(self):
+        """Команда recount_counters исправляет разошедшиеся счётчики."""
+        post = Post.objects.create(
+            author=self.user, text='Тестовый пост', group=self.group)
+        Comment.objects.create(
+            post=post, author=self.reader, text='Комментарий')
+        AuthorStats.objects.filter(user=self.user).update(posts_count=42)
+        AuthorStats.objects.filter(user=self.reader).delete()
+        Group.objects.filter(pk=self.group.pk).update(posts_count=7)
+        Post.objects.filter(pk=post.pk).update(comments_count=0)
+
+        call_command('recount_counters', stdout=StringIO())
+
+        post.refresh_from_db()
+        self.group.refresh_from_db()
+        self.assertEqual(self.stats(self.user).posts_count, 1)
+        self.assertEqual(self.stats(self.reader).posts_count, 0)
+        self.assertEqual(self.group.posts_count, 1)
+        self.assertEqual(post.comments_count, 1)
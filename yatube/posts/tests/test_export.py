@@ -0,0 +1,68 @@
+import csv
+import json
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Group, Post
+
+User = get_user_model()
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.other = User.objects.create_user(username='other')
+        cls.group = Group.objects.create(title='Группа', slug='slug')
+        cls.post = Post.objects.create(
+            author=cls.user, text='Пост для выгрузки', group=cls.group)
+        cls.comment = Comment.objects.create(
+            post=cls.post, author=cls.user, text='Свой комментарий')
+        Post.objects.create(author=cls.other, text='Чужой пост')
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.url = reverse('posts:profile_export', args=(self.user.username,))
+
+    def test_export_ndjson(self):
+        """Выгрузка отдаёт посты и комментарии автора потоком NDJSON."""
+        response = self.authorized_client.get(self.url)
+        self.assertTrue(response.streaming)
+        rows = [
+            json.loads(line)
+            for line in b''.join(response.streaming_content)
+            .decode().splitlines()
+        ]
+        self.assertEqual(
+            [(row['type'], row['id']) for row in rows],
+            [('post', self.post.pk), ('comment', self.comment.pk)]
+        )
+        self.assertEqual(rows[0]['group'], self.group.slug)
+        self.assertEqual(rows[1]['post'], self.post.pk)
+
+    def test_export_csv(self):
+        """Выгрузка в CSV содержит заголовок и строки автора."""
+        response = self.authorized_client.get(self.url, {'format': 'csv'})
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.DictReader(
+            b''.join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]['text'], self.post.text)
+
+    def test_export_forbidden_for_others(self):
+        """Чужие данные выгрузить нельзя."""
+        response = self.authorized_client.get(
+            reverse('posts:profile_export', args=(self.other.username,)))
+        self.assertEqual(response.status_code, 403)
+
+    def test_export_command(self):
+        """Команда export_data пишет ту же выгрузку в stdout."""
+        out = StringIO()
+        call_command('export_data', self.user.username, stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 2)
@@ -0,0 +1,49 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from posts.follow_graph import follow_graph
+from posts.models import Follow
+
+User = get_user_model()
+
+
+class FollowGraphTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='reader')
+        cls.authors = [
+            User.objects.create_user(username=f'author{i}') for i in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def test_batch_is_following_uses_cache(self):
+        """Пачка авторов проверяется без запросов при тёплом кэше."""
+        Follow.objects.create(user=self.reader, author=self.authors[0])
+        follow_graph.following(self.reader.pk)
+        author_ids = [author.pk for author in self.authors]
+        with self.assertNumQueries(0):
+            result = follow_graph.is_following(self.reader.pk, author_ids)
+        self.assertEqual(result, {
+            self.authors[0].pk: True,
+            self.authors[1].pk: False,
+            self.authors[2].pk: False,
+        })
+
+    def test_follow_and_unfollow_keep_cache_consistent(self):
+        """Подписка и отписка сразу видны в кэше."""
+        author_id = self.authors[1].pk
+        follow_graph.following(self.reader.pk)
+        self.assertTrue(follow_graph.follow(self.reader.pk, author_id))
+        self.assertFalse(follow_graph.follow(self.reader.pk, author_id))
+        self.assertIn(author_id, follow_graph.following(self.reader.pk))
+        self.assertTrue(follow_graph.unfollow(self.reader.pk, author_id))
+        self.assertNotIn(author_id, follow_graph.following(self.reader.pk))
+        self.assertFalse(Follow.objects.filter(user=self.reader).exists())
+
+    def test_self_follow_is_ignored(self):
+        """На себя подписаться нельзя."""
+        self.assertFalse(follow_graph.follow(self.reader.pk, self.reader.pk))
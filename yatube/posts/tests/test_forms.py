@@ -1,12 +1,15 @@
+import os
 import shutil
 import tempfile
 from http import HTTPStatus
+from io import BytesIO
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
+from PIL import Image
 
 from posts.models import Comment, Group, Post
 
@@ -79,7 +82,7 @@ class PostFormTests(TestCase):
                 text=form_data['text'],
                 group=form_data['group'],
                 author=self.user,
-                image='posts/small.gif'
+                image__regex=r'^posts/[0-9a-f]{64}\.jpg$'
             ).exists()
         )
 
@@ -106,9 +109,46 @@ class PostFormTests(TestCase):
             text=form_data['text'],
             group=form_data['group'],
             author=self.user,
-            image='posts/small_1.gif'
+            image__regex=r'^posts/[0-9a-f]{64}\.jpg$'
         ).exists())
 
+    @override_settings(IMAGE_MAX_SIZE=100)
+    def test_images_are_normalized_and_shared(self):
+        """Картинки ужимаются, теряют EXIF и не дублируются на диске."""
+        buffer = BytesIO()
+        exif = Image.Exif()
+        exif[0x010F] = 'Camera'
+        Image.new('RGB', (300, 150), 'red').save(buffer, 'JPEG', exif=exif)
+        names = []
+        for name in ('photo.jpg', 'copy.jpg'):
+            self.authorized_client.post(reverse('posts:post_create'), data={
+                'text': f'Пост {name}',
+                'image': SimpleUploadedFile(
+                    name, buffer.getvalue(), content_type='image/jpeg'),
+            })
+            names.append(Post.objects.get(text=f'Пост {name}').image.name)
+        self.assertEqual(names[0], names[1])
+        path = os.path.join(TEMP_MEDIA_ROOT, names[0])
+        with Image.open(path) as image:
+            self.assertEqual(image.size, (100, 50))
+            self.assertNotIn('exif', image.info)
+
+    def test_truncated_image_is_form_error(self):
+        """Обрезанный JPEG даёт ошибку формы, а не 500."""
+        buffer = BytesIO()
+        Image.effect_noise((300, 300), 64).save(buffer, 'JPEG')
+        response = self.authorized_client.post(
+            reverse('posts:post_create'), data={
+                'text': 'Пост с обрезанной картинкой',
+                'image': SimpleUploadedFile(
+                    'broken.jpg', buffer.getvalue()[:2000],
+                    content_type='image/jpeg'),
+            })
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertTrue(response.context['form'].has_error('image'))
+        self.assertFalse(Post.objects.filter(
+            text='Пост с обрезанной картинкой').exists())
+
     def test_add_comment_authorizet(self):
         """Валидная форма создает CommentForm."""
         comment_count = Comment.objects.count()
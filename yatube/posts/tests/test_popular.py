@@ -0,0 +1,77 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Comment, Follow, PopularPost, Post
+from posts.popular import update_ranking
+
+User = get_user_model()
+
+
+class PopularTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.quiet = Post.objects.create(author=cls.author, text='Тихий пост')
+        cls.hot = Post.objects.create(author=cls.author, text='Горячий пост')
+        cls.cold = Post.objects.create(author=cls.author, text='Без событий')
+
+    def setUp(self):
+        cache.clear()
+
+    def comment(self, post, count=1):
+        for _ in range(count):
+            Comment.objects.create(
+                post=post, author=self.reader, text='Комментарий')
+
+    def scores(self):
+        return dict(PopularPost.objects.values_list('post_id', 'score'))
+
+    def test_ranking_by_comments(self):
+        """Посты ранжируются по числу свежих комментариев."""
+        self.comment(self.quiet)
+        self.comment(self.hot, 3)
+        update_ranking()
+        response = Client().get(reverse('posts:popular_index'))
+        self.assertEqual(
+            list(response.context['page_obj']), [self.hot, self.quiet])
+        self.assertEqual(response.query_count, 1)
+
+    def test_incremental_update_decays_scores(self):
+        """Повторный запуск только затухает старые оценки и учитывает
+        новые события."""
+        now = timezone.now()
+        self.comment(self.hot, 2)
+        update_ranking(now)
+        first = self.scores()[self.hot.pk]
+        later = now + timedelta(seconds=settings.POPULAR_HALF_LIFE)
+        update_ranking(later)
+        self.assertAlmostEqual(self.scores()[self.hot.pk], first / 2)
+
+        self.comment(self.quiet)
+        update_ranking(later)
+        self.assertIn(self.quiet.pk, self.scores())
+        self.assertAlmostEqual(self.scores()[self.hot.pk], first / 2)
+
+    def test_new_followers_boost_author_posts(self):
+        """Новые подписчики поднимают свежие посты автора."""
+        update_ranking()
+        Follow.objects.create(user=self.reader, author=self.author)
+        update_ranking()
+        self.assertEqual(
+            set(self.scores()), {self.quiet.pk, self.hot.pk, self.cold.pk})
+
+    def test_posts_leave_window(self):
+        """Посты старше окна выпадают из рейтинга."""
+        self.comment(self.hot)
+        now = timezone.now()
+        update_ranking(now)
+        update_ranking(now + timedelta(seconds=settings.POPULAR_WINDOW + 1))
+        self.assertEqual(self.scores(), {})
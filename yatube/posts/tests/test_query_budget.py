@@ -0,0 +1,88 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.testing import QueryBudgetMixin
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+QUERY_BUDGETS = {
+    'posts:index': 1,
+    'posts:group_list': 2,
+    'posts:profile': 4,
+    'posts:post_detail': 4,
+    'posts:follow_index': 1,
+}
+
+
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    query_budgets = QUERY_BUDGETS
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        authors = [
+            User.objects.create_user(username=f'author{i}')
+            for i in range(settings.POST_LIMIT)
+        ]
+        cls.reader = User.objects.create_user(username='reader')
+        groups = [
+            Group.objects.create(title=f'Группа {i}', slug=f'group-{i}')
+            for i in range(settings.POST_LIMIT)
+        ]
+        for author, group in zip(authors, groups):
+            Follow.objects.create(user=cls.reader, author=author)
+            Post.objects.create(author=author, group=group, text='Пост')
+        cls.author = authors[0]
+        cls.group = groups[0]
+        cls.small_group = groups[1]
+        Post.objects.bulk_create(
+            Post(author=cls.author, group=cls.group, text=f'Пост {i}')
+            for i in range(settings.POST_LIMIT)
+        )
+        cls.post = Post.objects.filter(author=cls.author).first()
+        for author in authors:
+            Comment.objects.create(
+                post=cls.post, author=author, text='Комментарий')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.reader)
+        # Первый запрос кладёт пользователя в кэш.
+        self.client.get(reverse('about:author'))
+
+    def test_views_stay_within_budget(self):
+        """Страницы укладываются в бюджет SQL-запросов."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=(self.group.slug,)),
+            reverse('posts:profile', args=(self.author.username,)),
+            reverse('posts:post_detail', args=(self.post.pk,)),
+            reverse('posts:follow_index'),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertQueryBudget(response)
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        """Число запросов не растёт вместе с числом постов на странице."""
+        full = self.client.get(
+            reverse('posts:group_list', args=(self.group.slug,)))
+        single = self.client.get(
+            reverse('posts:group_list', args=(self.small_group.slug,)))
+        self.assertEqual(len(single.context['page_obj']), 1)
+        self.assertEqual(full.query_count, single.query_count)
+
+    def test_debug_header(self):
+        """При QUERY_STATS_HEADER ответ содержит заголовок X-DB-Queries."""
+        with self.settings(QUERY_STATS_HEADER=True):
+            response = self.client.get(reverse('posts:index'))
+        self.assertEqual(
+            int(response['X-DB-Queries'].split(';')[0]),
+            response.query_count
+        )
@@ -0,0 +1,96 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+# Полный проход по таблице без индекса: «SCAN posts_post»
+# (в старых версиях SQLite — «SCAN TABLE posts_post»).
+FULL_SCAN = re.compile(r'^SCAN (TABLE )?\w+$')
+TEMP_SORT = 'USE TEMP B-TREE'
+
+
+class QueryPlanTests(TestCase):
+    """Запросы лент не должны сканировать таблицы и сортировать
+    во временном B-дереве: все они обязаны идти по индексам."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Тестовый пост',
+            group=cls.group,
+        )
+        Comment.objects.create(
+            post=cls.post, author=cls.reader, text='Комментарий')
+        Follow.objects.create(user=cls.reader, author=cls.user)
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def query_plans(self, url, data=None):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url, data)
+        plans = []
+        with connection.cursor() as cursor:
+            for query in queries.captured_queries:
+                sql = query['sql']
+                if not sql.startswith('SELECT') or 'posts_' not in sql:
+                    continue
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                plans.append((sql, [row[-1] for row in cursor.fetchall()]))
+        return plans
+
+    def assert_indexed(self, url, data=None):
+        plans = self.query_plans(url, data)
+        self.assertTrue(plans)
+        for sql, steps in plans:
+            for step in steps:
+                with self.subTest(sql=sql, step=step):
+                    self.assertNotRegex(step, FULL_SCAN)
+                    self.assertNotIn(TEMP_SORT, step)
+
+    def test_feed_views_use_indexes(self):
+        """Ленты и страница поста читаются по индексам."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=(self.group.slug,)),
+            reverse('posts:profile', args=(self.user.username,)),
+            reverse('posts:post_detail', args=(self.post.pk,)),
+            reverse('posts:follow_index'),
+            reverse('posts:popular_index'),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assert_indexed(url)
+
+    def test_next_pages_use_indexes(self):
+        """Переход по курсору и по ?page=N тоже идёт по индексам."""
+        Post.objects.bulk_create(
+            Post(author=self.user, group=self.group, text=f'Пост {i}')
+            for i in range(15)
+        )
+        for name, args in (
+            ('posts:index', ()),
+            ('posts:group_list', (self.group.slug,)),
+            ('posts:profile', (self.user.username,)),
+        ):
+            url = reverse(name, args=args)
+            page = self.client.get(url).context['page_obj']
+            with self.subTest(url=url):
+                self.assert_indexed(url, {'cursor': page.next_cursor})
+                self.assert_indexed(url, {'page': 2})
@@ -0,0 +1,157 @@
+import os
+import sqlite3
+import tempfile
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.auth import SESSION_KEY, get_user_model
+from django.contrib.sessions.backends.cached_db import SessionStore
+from django.core.cache import cache
+from django.db import connection, connections, router
+from django.http import HttpResponse
+from django.test import (
+    Client, RequestFactory, TestCase, override_settings
+)
+from django.urls import reverse
+
+from core.middleware import ReplicaMiddleware
+from core.replicas import copy_database, replica_reads
+from posts.follow_graph import follow_graph
+from posts.models import Follow, Post
+
+User = get_user_model()
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRoutingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.other = User.objects.create_user(username='other')
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        # Соединение с репликой не открывается: роутеру нужно только имя.
+        patcher = mock.patch('core.replicas.connections', {
+            'default': connection,
+            'replica': SimpleNamespace(settings_dict={'NAME': 'replica'}),
+        })
+        self.connections = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def read_db(self, method, user=None):
+        """Куда пошло бы чтение поста внутри запроса."""
+        request = getattr(self.factory, method)('/')
+        request.session = SessionStore()
+        request.user = user or User()
+        if user is not None:
+            request.session[SESSION_KEY] = str(user.pk)
+        seen = []
+
+        def view(request):
+            seen.append(router.db_for_read(Post))
+            return HttpResponse()
+
+        ReplicaMiddleware(view)(request)
+        return seen[0]
+
+    def test_safe_requests_read_from_replica(self):
+        """GET читает с реплики, пишущий запрос и код вне запроса — нет."""
+        self.assertEqual(self.read_db('get'), 'replica')
+        self.assertEqual(self.read_db('get', self.user), 'replica')
+        self.assertEqual(self.read_db('post', self.user), 'default')
+        self.assertEqual(router.db_for_read(Post), 'default')
+        self.assertEqual(router.db_for_write(Post), 'default')
+
+    def test_write_pins_reads_to_primary(self):
+        """После записи пользователь читает с default, остальные — нет."""
+        self.read_db('post', self.user)
+        self.assertEqual(self.read_db('get', self.user), 'default')
+        self.assertEqual(self.read_db('get', self.other), 'replica')
+        with self.settings(REPLICA_PIN_SECONDS=0):
+            self.read_db('post', self.other)
+        self.assertEqual(self.read_db('get', self.other), 'replica')
+
+    def test_mirror_of_primary_is_primary(self):
+        """Реплика с той же базой, что default, не используется."""
+        self.connections['replica'].settings_dict['NAME'] = (
+            connection.settings_dict['NAME'])
+        self.assertEqual(self.read_db('get'), 'default')
+
+    def test_copy_database(self):
+        """Файловая реплика получает данные основной базы."""
+        with tempfile.TemporaryDirectory() as path:
+            source = os.path.join(path, 'db.sqlite3')
+            target = os.path.join(path, 'replica.sqlite3')
+            db = sqlite3.connect(source)
+            db.execute('CREATE TABLE post (text TEXT)')
+            db.execute("INSERT INTO post VALUES ('Пост')")
+            db.commit()
+            copy_database(source, target)
+            db.close()
+            replica = sqlite3.connect(target)
+            self.assertEqual(
+                replica.execute('SELECT text FROM post').fetchall(),
+                [('Пост',)]
+            )
+            replica.close()
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class LaggingReplicaTests(TestCase):
+    """Реплика — снимок базы, сделанный до подписки."""
+    databases = {'default', 'replica'}
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.replica_path = os.path.join(cls.directory.name, 'replica.sqlite3')
+        connections.databases['replica'] = {
+            **connections.databases['default'], 'NAME': cls.replica_path
+        }
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections['replica'].close()
+        del connections.databases['replica']
+        del connections._connections.replica
+        cls.directory.cleanup()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+        cls.author = User.objects.create_user(username='author')
+        # backup() ждёт конца открытой транзакции теста, а iterdump()
+        # читает её через то же соединение.
+        connection.ensure_connection()
+        replica = sqlite3.connect(cls.replica_path)
+        replica.executescript('\n'.join(connection.connection.iterdump()))
+        replica.close()
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_follow_by_get_is_visible_on_profile(self):
+        """Подписка по GET сразу видна в профиле, хотя реплика отстаёт."""
+        self.client.get(
+            reverse('posts:profile_follow', args=[self.author.username]))
+        self.assertTrue(Follow.objects.filter(
+            user=self.user, author=self.author).exists())
+        self.assertFalse(Follow.objects.using('replica').exists())
+        response = self.client.get(
+            reverse('posts:profile', args=[self.author.username]))
+        self.assertTrue(response.context['following'])
+
+    def test_following_is_cached_from_primary(self):
+        """Кэш подписок заполняется из default даже при чтении с реплик."""
+        Follow.objects.create(user=self.user, author=self.author)
+        with replica_reads():
+            self.assertEqual(router.db_for_read(Follow), 'replica')
+            self.assertIn(
+                self.author.pk, follow_graph.following(self.user.pk))
@@ -0,0 +1,93 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Post
+from posts.search import ENDINGS, build_query, stem
+
+User = get_user_model()
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Сегодня мы гуляли по набережной',
+        )
+        cls.other_post = Post.objects.create(
+            author=cls.user,
+            text='Рецепт пирога с яблоками',
+        )
+        cls.comment = Comment.objects.create(
+            post=cls.other_post,
+            author=cls.user,
+            text='Отличная набережная, я тоже там был',
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def found(self, query, **params):
+        response = self.guest_client.get(
+            reverse('posts:search'), {'q': query, **params})
+        return [
+            (entry.kind, entry.object_id)
+            for entry in response.context['page_obj']
+        ]
+
+    def test_stem_merges_word_forms(self):
+        """Разные формы слова сводятся к одной основе."""
+        self.assertEqual(stem('набережной'), stem('набережная'))
+        self.assertEqual(stem('Пироги'), stem('пирога'))
+
+    def test_endings_are_unique_and_longest_first(self):
+        """Окончания не повторяются и проверяются от длинных к коротким."""
+        self.assertEqual(len(ENDINGS), len(set(ENDINGS)))
+        self.assertEqual(
+            list(ENDINGS), sorted(ENDINGS, key=len, reverse=True))
+
+    def test_query_syntax_is_escaped(self):
+        """Синтаксис FTS5 во вводе пользователя не интерпретируется."""
+        self.assertEqual(build_query('"пост" OR'), '"пост"* "or"*')
+
+    def test_search_posts_and_comments(self):
+        """Поиск находит посты и комментарии в разных формах слова."""
+        self.assertCountEqual(
+            self.found('набережные'),
+            [('post', self.post.pk), ('comment', self.comment.pk)]
+        )
+        self.assertEqual(
+            self.found('пироги'), [('post', self.other_post.pk)])
+        self.assertEqual(self.found(''), [])
+
+    def test_index_follows_edits_and_deletes(self):
+        """Индекс обновляется при правке и удалении поста."""
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Теперь здесь про горы'
+        post.save()
+        self.assertEqual(self.found('гор'), [('post', post.pk)])
+        self.assertNotIn(('post', post.pk), self.found('набережная'))
+        Post.objects.get(pk=self.other_post.pk).delete()
+        self.assertEqual(self.found('набережная'), [])
+
+    def test_results_are_paginated(self):
+        """Результаты поиска постранично листаются курсором."""
+        Post.objects.bulk_create(
+            Post(author=self.user, text='Служебный текст') for _ in range(3)
+        )
+        for post in Post.objects.filter(text='Служебный текст'):
+            post.save()
+        with self.settings(POST_LIMIT=2):
+            response = self.guest_client.get(
+                reverse('posts:search'), {'q': 'служебный'})
+            first = response.context['page_obj']
+            second = self.guest_client.get(
+                reverse('posts:search'),
+                {'q': 'служебный', 'cursor': first.next_cursor}
+            ).context['page_obj']
+        self.assertEqual(len(first), 2)
+        self.assertEqual(len(second), 1)
+        self.assertContains(response, 'q=%D1%81%D0%BB')
@@ -0,0 +1,70 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from core.throttling import client_ip, take_token, throttle_stats
+from posts.models import Comment, Post
+
+User = get_user_model()
+
+
+@override_settings(THROTTLE_RATES={'add_comment': (2, 60)})
+class ThrottlingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.staff = User.objects.create_user(username='staff', is_staff=True)
+        cls.post = Post.objects.create(author=cls.user, text='Тестовый пост')
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('posts:add_comment', args=(self.post.pk,))
+
+    def comment(self, user):
+        client = Client()
+        client.force_login(user)
+        return [
+            client.post(self.url, {'text': f'Комментарий {i}'})
+            for i in range(3)
+        ]
+
+    def test_bucket_overflow_returns_429(self):
+        """Сверх ёмкости ведра запрос получает 429 с Retry-After."""
+        responses = self.comment(self.user)
+        self.assertEqual(
+            [response.status_code for response in responses],
+            [302, 302, 429]
+        )
+        self.assertEqual(responses[-1]['Retry-After'], '30')
+        self.assertEqual(Comment.objects.count(), 2)
+        self.assertEqual(
+            throttle_stats()['add_comment'],
+            {'allowed': 2, 'throttled': 1}
+        )
+
+    def test_staff_bypass(self):
+        """Staff не ограничивается."""
+        responses = self.comment(self.staff)
+        self.assertNotIn(429, [response.status_code for response in responses])
+
+    def test_bucket_refills(self):
+        """Ведро наполняется со временем."""
+        self.assertEqual(take_token('add_comment', 'ip:1', now=0), 0)
+        self.assertEqual(take_token('add_comment', 'ip:1', now=0), 0)
+        self.assertEqual(take_token('add_comment', 'ip:1', now=0), 30)
+        self.assertEqual(take_token('add_comment', 'ip:1', now=30), 0)
+
+    def test_client_ip_behind_proxy(self):
+        """За прокси IP берётся из заголовка, подделанное начало — нет."""
+        request = RequestFactory().get(
+            '/', REMOTE_ADDR='10.0.0.1',
+            HTTP_X_FORWARDED_FOR='6.6.6.6, 1.2.3.4')
+        self.assertEqual(client_ip(request), '10.0.0.1')
+        with self.settings(THROTTLE_CLIENT_IP_HEADER='HTTP_X_FORWARDED_FOR'):
+            self.assertEqual(client_ip(request), '1.2.3.4')
+            with self.settings(THROTTLE_TRUSTED_PROXIES=2):
+                self.assertEqual(client_ip(request), '6.6.6.6')
+            with self.settings(THROTTLE_TRUSTED_PROXIES=3):
+                self.assertEqual(client_ip(request), '10.0.0.1')
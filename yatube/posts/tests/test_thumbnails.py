@@ -0,0 +1,151 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, connections
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts import thumbnails
+from posts.models import Post
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+User = get_user_model()
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Пост с картинкой',
+            image=SimpleUploadedFile(
+                name='thumb.gif',
+                content=SMALL_GIF,
+                content_type='image/gif'
+            ),
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_placeholder_until_generated(self):
+        """Пока миниатюры нет, страница показывает заглушку и не создаёт её."""
+        url = reverse('posts:post_detail', args=(self.post.pk,))
+        response = self.guest_client.get(url)
+        self.assertContains(response, 'Изображение обрабатывается')
+        self.assertIsNone(thumbnails.lookup(self.post.image))
+
+    def test_generated_thumbnail_is_rendered(self):
+        """После генерации страница выводит готовую миниатюру."""
+        thumbnails.generate(self.post.image.name)
+        image = thumbnails.lookup(self.post.image)
+        self.assertIsNotNone(image)
+        response = self.guest_client.get(
+            reverse('posts:post_detail', args=(self.post.pk,)))
+        self.assertContains(response, image.url)
+        self.assertNotContains(response, 'Изображение обрабатывается')
+
+    def test_miss_enqueues_generation(self):
+        """Промах ставит картинку в очередь, даже если пост не из формы."""
+        self.guest_client.get(reverse('posts:index'))
+        self.assertTrue(cache.get(
+            f'posts:thumbnail_pending:{self.post.image.name}'))
+
+    def test_generation_invalidates_feed_and_etag(self):
+        """Готовая миниатюра сразу видна в ленте, старый ETag не даёт 304."""
+        url = reverse('posts:index')
+        self.guest_client.get(url)
+        response = self.guest_client.get(url)
+        self.assertContains(response, 'Изображение обрабатывается')
+        etag = response['ETag']
+        thumbnails.generate(self.post.image.name)
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(
+            response, thumbnails.lookup(self.post.image).url)
+
+    def test_backfill_command(self):
+        """generate_thumbnails создаёт недостающие миниатюры."""
+        call_command('generate_thumbnails', stdout=StringIO())
+        self.assertIsNotNone(thumbnails.lookup(self.post.image))
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class FileDatabaseBackfillTests(TestCase):
+    """Посты читаются из файловой базы: её соединение закрываемо,
+    в отличие от тестовой базы в памяти."""
+    databases = {'default', 'file'}
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.directory.name, 'db.sqlite3')
+        connections.databases['file'] = {
+            **connections.databases['default'], 'NAME': cls.path
+        }
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections['file'].close()
+        del connections.databases['file']
+        del connections._connections.file
+        cls.directory.cleanup()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(username='auth')
+        for number in range(3):
+            Post.objects.create(
+                author=user,
+                text=f'Пост {number}',
+                image=SimpleUploadedFile(
+                    name=f'file{number}.gif',
+                    content=SMALL_GIF,
+                    content_type='image/gif'
+                ),
+            )
+        connection.ensure_connection()
+        db = sqlite3.connect(cls.path)
+        # Полнотекстовый индекс iterdump не восстанавливает, он и не нужен.
+        db.executescript('\n'.join(
+            line for line in connection.connection.iterdump()
+            if 'posts_search' not in line
+        ))
+        db.close()
+
+    def test_backfill_keeps_connection_open(self):
+        """backfill не закрывает соединение, из которого читает посты."""
+        cache.clear()
+        images, created, failed = thumbnails.backfill(
+            Post.objects.using('file').order_by('pk'))
+        self.assertEqual((images, created, failed), (3, 3, 0))
@@ -0,0 +1,83 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from posts.models import Follow, Post, TimelineEntry
+
+User = get_user_model()
+
+
+class TimelineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.old_post = Post.objects.create(
+            author=cls.author,
+            text='Старый пост',
+        )
+
+    def timeline_posts(self):
+        return list(
+            TimelineEntry.objects.filter(user=self.reader)
+            .values_list('post_id', flat=True)
+        )
+
+    def test_follow_backfills_timeline(self):
+        """После подписки в ленте появляются старые посты автора."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.assertEqual(self.timeline_posts(), [self.old_post.pk])
+
+    def test_new_post_fans_out(self):
+        """Новый пост попадает в ленты подписчиков, но не остальным."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        self.assertIn(post.pk, self.timeline_posts())
+        self.assertFalse(
+            TimelineEntry.objects.filter(user=self.author).exists()
+        )
+
+    def test_unfollow_clears_timeline(self):
+        """После отписки посты автора убираются из ленты."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        Follow.objects.filter(user=self.reader, author=self.author).delete()
+        self.assertEqual(self.timeline_posts(), [])
+
+    @override_settings(TIMELINE_DEPTH=2)
+    def test_timeline_is_trimmed(self):
+        """Лента обрезается до TIMELINE_DEPTH последних постов."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        posts = [
+            Post.objects.create(author=self.author, text=f'Пост {i}')
+            for i in range(3)
+        ]
+        self.assertCountEqual(
+            self.timeline_posts(), [posts[1].pk, posts[2].pk]
+        )
+
+    @override_settings(TIMELINE_DEPTH=2)
+    def test_fan_out_trims_all_followers_at_once(self):
+        """Обрезка лент всех подписчиков — один DELETE."""
+        readers = [
+            User.objects.create_user(username=f'reader{i}') for i in range(3)
+        ]
+        for reader in readers:
+            Follow.objects.create(user=reader, author=self.author)
+        Post.objects.create(author=self.author, text='Новый пост')
+        with CaptureQueriesContext(connection) as queries:
+            post = Post.objects.create(author=self.author, text='Ещё пост')
+        deletes = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('DELETE FROM posts_timelineentry')
+        ]
+        self.assertEqual(len(deletes), 1)
+        for reader in readers:
+            self.assertEqual(
+                list(TimelineEntry.objects.filter(user=reader)
+                     .order_by('-pub_date', '-post_id')
+                     .values_list('post_id', flat=True))[0],
+                post.pk
+            )
+            self.assertEqual(reader.timeline.count(), 2)
@@ -0,0 +1,55 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from users.backends import user_cache_key
+
+User = get_user_model()
+
+
+class UserCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.url = reverse('about:author')
+        self.authorized_client.get(self.url)
+
+    def test_session_and_user_come_from_cache(self):
+        """Повторный запрос не читает сессию и пользователя из базы."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.authorized_client.get(self.url)
+        self.assertEqual(response.context['user'], self.user)
+        for query in queries.captured_queries:
+            self.assertNotIn('django_session', query['sql'])
+            self.assertNotIn('auth_user', query['sql'])
+
+    def test_profile_edit_invalidates(self):
+        """Изменение пользователя сразу видно в следующем запросе."""
+        user = User.objects.get(pk=self.user.pk)
+        user.username = 'renamed'
+        user.save()
+        response = self.authorized_client.get(self.url)
+        self.assertEqual(response.context['user'].username, 'renamed')
+
+    def test_password_change_logs_out(self):
+        """После смены пароля старая сессия перестаёт действовать."""
+        user = User.objects.get(pk=self.user.pk)
+        user.set_password('new-password-123')
+        user.save()
+        response = self.authorized_client.get(self.url)
+        self.assertFalse(response.context['user'].is_authenticated)
+
+    def test_logout_forgets_user(self):
+        """Выход удаляет пользователя из кэша."""
+        self.assertIsNotNone(cache.get(user_cache_key(self.user.pk)))
+        self.authorized_client.get(reverse('users:logout'))
+        self.assertIsNone(cache.get(user_cache_key(self.user.pk)))
@@ -0,0 +1,94 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Post
+from posts.utils import MAX_PAGE_NUMBER
+
+User = get_user_model()
+
+POSTS_COUNT = 13
+
+
+class CursorPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f'Тестовый пост {i}')
+            for i in range(POSTS_COUNT)
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def test_pages_follow_cursors(self):
+        """Курсоры ведут на следующую и предыдущую страницы."""
+        url = reverse('posts:index')
+        first = self.guest_client.get(url).context['page_obj']
+        self.assertEqual(len(first), settings.POST_LIMIT)
+        self.assertFalse(first.has_previous())
+        self.assertTrue(first.has_next())
+
+        second = self.guest_client.get(
+            url, {'cursor': first.next_cursor}).context['page_obj']
+        self.assertEqual(second.number, 2)
+        self.assertEqual(len(second), POSTS_COUNT - settings.POST_LIMIT)
+        self.assertFalse(second.has_next())
+
+        back = self.guest_client.get(
+            url, {'cursor': second.previous_cursor}).context['page_obj']
+        self.assertEqual(back.number, 1)
+        self.assertEqual(list(back), list(first))
+
+    def test_pages_do_not_overlap(self):
+        """Страницы не пересекаются и покрывают все посты по порядку."""
+        url = reverse('posts:index')
+        first = self.guest_client.get(url).context['page_obj']
+        second = self.guest_client.get(
+            url, {'cursor': first.next_cursor}).context['page_obj']
+        self.assertEqual(
+            [post.pk for post in list(first) + list(second)],
+            list(Post.objects.order_by('-pub_date', '-pk')
+                 .values_list('pk', flat=True))
+        )
+
+    def test_page_number_fallback(self):
+        """Старые ссылки ?page=N продолжают работать."""
+        url = reverse('posts:index')
+        cursor_page = self.guest_client.get(url).context['page_obj']
+        second_cursor = self.guest_client.get(
+            url, {'cursor': cursor_page.next_cursor}).context['page_obj']
+        second_number = self.guest_client.get(
+            url, {'page': 2}).context['page_obj']
+        self.assertEqual(second_number.number, 2)
+        self.assertEqual(list(second_number), list(second_cursor))
+
+    def test_deep_page_number_is_not_read(self):
+        """Номер страницы сверх MAX_PAGE_NUMBER не превращается в OFFSET."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.guest_client.get(
+                reverse('posts:index'), {'page': MAX_PAGE_NUMBER + 1})
+        self.assertEqual(response.context['page_obj'].number, 1)
+        for query in queries.captured_queries:
+            self.assertNotIn('OFFSET', query['sql'])
+
+    def test_broken_cursor_returns_first_page(self):
+        """Испорченный курсор отдаёт первую страницу."""
+        response = self.guest_client.get(
+            reverse('posts:index'), {'cursor': 'broken'})
+        self.assertEqual(response.context['page_obj'].number, 1)
+
+    def test_no_count_query(self):
+        """Пагинация не выполняет COUNT(*)."""
+        with CaptureQueriesContext(connection) as queries:
+            self.guest_client.get(
+                reverse('posts:profile', args=(self.user.username,)),
+                {'page': 2}
+            )
+        for query in queries.captured_queries:
+            self.assertNotIn('COUNT(', query['sql'])
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
 from django.test import Client, TestCase
@@ -85,14 +86,14 @@ class PostViewsTests(TestCase):
         self.assertEqual(context_post.image, self.post.image)
 
     def test_index_cache1(self):
-        """Тест кэша 1"""
+        """Тест кэша 1: фрагмент берётся из кэша, пока посты не менялись"""
         post = Post.objects.create(
             author=self.user,
             text='Новый тестовый пост'
         )
         response = self.authorized_client.get(reverse('posts:index'))
         temp = response.content
-        post.delete()
+        Post.objects.filter(pk=post.pk).update(text='Изменено в обход ORM')
         response = self.authorized_client.get(reverse('posts:index'))
         self.assertEqual(response.content, temp)
         cache.clear()
@@ -100,15 +101,37 @@ class PostViewsTests(TestCase):
         self.assertNotEqual(response.content, temp)
 
     def test_index_cache2(self):
-        """Тест кэша2"""
+        """Тест кэша 2: удаление поста сбрасывает кэш ленты"""
+        post = Post.objects.create(
+            text='Тестовый пост для удаления',
+            author=self.user,
+        )
+        response = self.authorized_client.get(reverse('posts:index'))
+        self.assertContains(response, post.text)
+        post.delete()
+        response = self.authorized_client.get(reverse('posts:index'))
+        self.assertNotContains(response, post.text)
+
+    def test_index_cache_new_post(self):
+        """Новый пост сразу виден на главной"""
+        self.authorized_client.get(reverse('posts:index'))
         post = Post.objects.create(
-            text='Тестовый пост',
+            text='Свежий пост',
             author=self.user,
         )
         response = self.authorized_client.get(reverse('posts:index'))
-        Post.objects.filter(pk=post.pk).delete()
-        response2 = self.authorized_client.get(reverse('posts:index'))
-        self.assertEqual(response.content, response2.content)
+        self.assertContains(response, post.text)
+
+    def test_index_cache_page_aware(self):
+        """Разные страницы главной кэшируются отдельно"""
+        Post.objects.bulk_create(
+            Post(author=self.user, text=f'Пост для страниц {i}')
+            for i in range(settings.POST_LIMIT)
+        )
+        first = self.guest_client.get(reverse('posts:index'))
+        second = self.guest_client.get(reverse('posts:index'), {'page': 2})
+        self.assertContains(second, self.post.text)
+        self.assertNotEqual(first.content, second.content)
 
     def test_follow_index_show_cont(self):
         """Шаблон follow сформирован с правильным контекстом."""
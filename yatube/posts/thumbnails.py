@@ -0,0 +1,138 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+from sorl.thumbnail import default, get_thumbnail
+from sorl.thumbnail.base import ThumbnailBackend
+from sorl.thumbnail.conf import defaults as sorl_defaults
+from sorl.thumbnail.conf import settings as sorl_settings
+from sorl.thumbnail.images import ImageFile
+
+from .feed_cache import bump_feed_version
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+CARD_GEOMETRY = '960x339'
+CARD_OPTIONS = {'crop': 'center', 'upscale': True}
+
+# Варианты, которые готовятся сразу после сохранения поста.
+VARIANTS = (
+    (CARD_GEOMETRY, CARD_OPTIONS),
+)
+
+# Сколько секунд картинка считается поставленной в очередь: повторные
+# промахи за это время не ставят её снова, а после сбоя она
+# перегенерируется.
+PENDING_TIMEOUT = 60
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.THUMBNAIL_WORKERS,
+    thread_name_prefix='thumbnails'
+)
+
+
+class LookupBackend(ThumbnailBackend):
+    """Ищет готовую миниатюру в kvstore sorl, никогда не создавая её."""
+
+    def get_thumbnail(self, file_, geometry_string, **options):
+        source = ImageFile(file_)
+        if sorl_settings.THUMBNAIL_PRESERVE_FORMAT:
+            options.setdefault('format', self._get_format(source))
+        for key, value in self.default_options.items():
+            options.setdefault(key, value)
+        for key, attr in self.extra_options:
+            value = getattr(sorl_settings, attr)
+            if value != getattr(sorl_defaults, attr):
+                options.setdefault(key, value)
+        name = self._get_thumbnail_filename(source, geometry_string, options)
+        return default.kvstore.get(ImageFile(name, default.storage))
+
+
+_lookup_backend = LookupBackend()
+
+
+def lookup(image, geometry=CARD_GEOMETRY, **options):
+    """Готовая миниатюра или None, если она ещё не создана."""
+    if not image:
+        return None
+    return _lookup_backend.get_thumbnail(
+        image, geometry, **(options or CARD_OPTIONS)
+    )
+
+
+def ready(image):
+    """Готовая миниатюра; при промахе картинка ставится в очередь.
+
+    Так миниатюры получают и посты, сохранённые в обход post_create и
+    post_edit: из админки, импорта или до появления фоновой генерации.
+    """
+    im = lookup(image)
+    if im is None and image:
+        enqueue(image.name)
+    return im
+
+
+def generate(name):
+    """Создаёт все варианты миниатюр для картинки поста.
+
+    Готовая миниатюра меняет карточки и страницу поста, поэтому
+    поколение лент сдвигается: фрагменты и ETag с заглушкой устаревают.
+    """
+    source = ImageFile(name, Post._meta.get_field('image').storage)
+    try:
+        for geometry, options in VARIANTS:
+            get_thumbnail(source, geometry, **options)
+    except Exception:
+        logger.exception('Не удалось создать миниатюры для %s', name)
+        return False
+    bump_feed_version()
+    return True
+
+
+def _generate_in_worker(name):
+    """generate в потоке пула: соединения потока закрываются после него.
+
+    Синхронным вызовам (backfill) закрывать соединения нельзя — они
+    ещё читают посты.
+    """
+    try:
+        return generate(name)
+    finally:
+        connections.close_all()
+
+
+def enqueue(name):
+    """Ставит генерацию в очередь после коммита, не чаще раза
+    в PENDING_TIMEOUT для одной картинки."""
+    if cache.add(f'posts:thumbnail_pending:{name}', True, PENDING_TIMEOUT):
+        transaction.on_commit(
+            lambda: _executor.submit(_generate_in_worker, name))
+
+
+def backfill(posts):
+    """Создаёт недостающие миниатюры для картинок постов.
+
+    Возвращает число картинок, созданных миниатюр и ошибок.
+    """
+    seen, created, failed = set(), 0, 0
+    for post in posts.exclude(image='').only('image').iterator():
+        name = post.image.name
+        if name in seen:
+            continue
+        seen.add(name)
+        if lookup(post.image) is not None:
+            continue
+        if generate(name):
+            created += 1
+        else:
+            failed += 1
+    return len(seen), created, failed
+
+
+def schedule(post):
+    """Ставит в очередь генерацию миниатюр после коммита транзакции."""
+    if post.image:
+        enqueue(post.image.name)
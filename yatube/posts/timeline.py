@@ -0,0 +1,95 @@
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+from .models import FEED_DEFERRED, Follow, Post, TimelineEntry
+
+TIMELINE_KEYS = ('-pub_date', '-post_id')
+
+
+def trim(user_ids):
+    """Оставляет в лентах только TIMELINE_DEPTH последних постов.
+
+    Все ленты обрезаются одним DELETE: номер записи в ленте считает
+    ROW_NUMBER() по индексу (user, -pub_date, -post).
+    """
+    ranked = TimelineEntry.objects.filter(user_id__in=user_ids).annotate(
+        timeline_rank=Window(
+            RowNumber(),
+            partition_by=[F('user_id')],
+            order_by=[F('pub_date').desc(), F('post_id').desc()],
+        )
+    ).values('pk', 'timeline_rank')
+    sql, params = ranked.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {TimelineEntry._meta.db_table} WHERE id IN '
+            f'(SELECT id FROM ({sql}) ranked WHERE timeline_rank > %s)',
+            [*params, settings.TIMELINE_DEPTH]
+        )
+
+
+def fan_out(post):
+    """Раскладывает новый пост по лентам подписчиков автора."""
+    followers = Follow.objects.filter(author_id=post.author_id)
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(user_id=user_id, post=post, pub_date=post.pub_date)
+            for user_id in followers.values_list('user_id', flat=True)
+        ],
+        ignore_conflicts=True
+    )
+    trim(followers.values('user_id'))
+
+
+def backfill(user_id, author_id):
+    """Добавляет в ленту последние посты автора после подписки."""
+    posts = (
+        Post.objects.filter(author_id=author_id)
+        .order_by('-pub_date', '-pk')
+        .values_list('pk', 'pub_date')[:settings.TIMELINE_DEPTH]
+    )
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(user_id=user_id, post_id=pk, pub_date=pub_date)
+            for pk, pub_date in posts
+        ],
+        ignore_conflicts=True
+    )
+    trim([user_id])
+
+
+def remove(user_id, author_id):
+    """Убирает из ленты посты автора после отписки."""
+    TimelineEntry.objects.filter(
+        user_id=user_id,
+        post__author_id=author_id
+    ).delete()
+
+
+def feed(user):
+    return TimelineEntry.objects.filter(user=user).select_related(
+        'post__author', 'post__group'
+    ).defer(*[f'post__{field}' for field in FEED_DEFERRED])
+
+
+def rebuild(user_ids=None):
+    """Заново собирает ленты, например после bulk_create в обход сигналов.
+
+    Лента каждого пользователя собирается одним запросом по постам всех
+    его авторов сразу.
+    """
+    if user_ids is None:
+        user_ids = Follow.objects.values_list('user_id', flat=True).distinct()
+    for user_id in user_ids:
+        TimelineEntry.objects.filter(user_id=user_id).delete()
+        posts = (
+            Post.objects.filter(author__following__user_id=user_id)
+            .order_by('-pub_date', '-pk')
+            .values_list('pk', 'pub_date')[:settings.TIMELINE_DEPTH]
+        )
+        TimelineEntry.objects.bulk_create(
+            TimelineEntry(user_id=user_id, post_id=pk, pub_date=pub_date)
+            for pk, pub_date in posts
+        )
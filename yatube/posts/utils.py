@@ -1,9 +1,135 @@
+import base64
+import json
+
 from django.conf import settings
 from django.core.paginator import Paginator
+from django.db.models import Q
+
+POST_KEYS = ('-pub_date', '-pk')
+COMMENT_KEYS = ('created', 'pk')
+
+# Дальше этой страницы ?page=N не читается: OFFSET растёт вместе с
+# номером, глубокие страницы доступны только по курсорам.
+MAX_PAGE_NUMBER = 50
+
+
+class CursorPaginator(Paginator):
+    """Keyset-пагинатор: страницы выбираются по ключу сортировки,
+    без COUNT(*) и OFFSET, поэтому любая страница отдаётся за одно
+    и то же время.
+
+    Все поля ключа сортируются в одном направлении, последнее поле
+    должно быть уникальным (обычно pk).
+    """
+
+    def __init__(self, object_list, per_page, keys=POST_KEYS):
+        super().__init__(object_list.order_by(*keys), per_page)
+        self.keys = keys
+        self.descending = keys[0].startswith('-')
+        self.fields = [key.lstrip('-') for key in keys]
+        # Общее число страниц неизвестно: пагинатор знает только,
+        # есть ли страница после текущей.
+        self.num_pages = 1
+
+    def encode_cursor(self, obj, number, backwards=False):
+        if isinstance(obj, dict):
+            values = [str(obj[field]) for field in self.fields]
+        else:
+            values = [str(getattr(obj, field)) for field in self.fields]
+        data = json.dumps([number, values, backwards]).encode()
+        return base64.urlsafe_b64encode(data).decode()
+
+    def decode_cursor(self, cursor):
+        try:
+            number, values, backwards = json.loads(
+                base64.urlsafe_b64decode(cursor.encode())
+            )
+            opts = self.object_list.model._meta
+            values = [
+                (opts.pk if field == 'pk' else opts.get_field(field))
+                .to_python(value)
+                for field, value in zip(self.fields, values)
+            ]
+        except Exception:
+            return None
+        if len(values) != len(self.fields) or not isinstance(number, int):
+            return None
+        return max(number, 1), values, bool(backwards)
+
+    def _seek(self, values, backwards):
+        """Условие «строго после» (или «строго до») ключа values."""
+        lookup = 'lt' if self.descending != backwards else 'gt'
+        condition = Q()
+        for i, field in enumerate(self.fields):
+            step = Q(**{f'{field}__{lookup}': values[i]})
+            for prev_field, value in zip(self.fields[:i], values):
+                step &= Q(**{prev_field: value})
+            condition |= step
+        return condition
+
+    def _make_page(self, rows, number, has_previous, has_next):
+        if not has_previous:
+            number = 1
+        elif number < 2:
+            number = 2
+        self.num_pages = number + 1 if has_next else number
+        page = self._get_page(rows, number, self)
+        page.next_cursor = (
+            self.encode_cursor(rows[-1], number + 1)
+            if has_next else None
+        )
+        page.previous_cursor = (
+            self.encode_cursor(rows[0], number - 1, backwards=True)
+            if has_previous else None
+        )
+        return page
+
+    def cursor_page(self, cursor=None):
+        """Страница по непрозрачному курсору; без курсора — первая."""
+        decoded = self.decode_cursor(cursor) if cursor else None
+        if decoded is None:
+            rows = list(self.object_list[:self.per_page + 1])
+            return self._make_page(
+                rows[:self.per_page], 1, False, len(rows) > self.per_page
+            )
+        number, values, backwards = decoded
+        queryset = self.object_list.filter(self._seek(values, backwards))
+        if backwards:
+            queryset = queryset.reverse()
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if not rows:
+            return self.cursor_page()
+        if backwards:
+            rows.reverse()
+            return self._make_page(rows, number, has_more, True)
+        return self._make_page(rows, number, True, has_more)
+
+    def number_page(self, number):
+        """Совместимость со старыми ссылками вида ?page=N."""
+        try:
+            number = max(int(number), 1)
+        except (TypeError, ValueError):
+            number = 1
+        if number > MAX_PAGE_NUMBER:
+            return self.cursor_page()
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            return self.cursor_page()
+        return self._make_page(
+            rows[:self.per_page], number, number > 1,
+            len(rows) > self.per_page
+        )
 
 
-def pagin(request, queryset):
-    paginator = Paginator(queryset, settings.POST_LIMIT)
+def pagin(request, queryset, keys=POST_KEYS, per_page=None):
+    paginator = CursorPaginator(
+        queryset, per_page or settings.POST_LIMIT, keys
+    )
+    cursor = request.GET.get('cursor')
     page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    return page_obj
+    if not cursor and page_number:
+        return paginator.number_page(page_number)
+    return paginator.cursor_page(cursor)
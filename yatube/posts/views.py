@@ -1,23 +1,39 @@
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
+from django.core.exceptions import PermissionDenied
+from django.db import transaction
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.views.decorators.http import condition
 
+from core.throttling import throttle
+
+from . import comment_queue, etags, export, popular, thumbnails, timeline
+from .counters import author_stats
+from .feed_cache import feed_version
+from .follow_graph import follow_graph
 from .forms import CommentForm, PostForm
-from .models import Follow, Group, Post, User
-from .utils import pagin
+from .models import Comment, Group, Post, SearchEntry, User
+from .search import SEARCH_KEYS, build_query
+from .utils import COMMENT_KEYS, pagin
 
 
+@condition(etag_func=etags.index)
 def index(request):
-    post_list = Post.objects.all()
+    post_list = Post.objects.for_feed()
     page_obj = pagin(request, post_list)
     context = {
         'page_obj': page_obj,
+        'feed_version': feed_version(),
+        'feed_cache_timeout': settings.FEED_CACHE_TIMEOUT,
     }
     return render(request, 'posts/index.html', context)
 
 
+@condition(etag_func=etags.group_list)
 def group_list(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
+    posts = group.posts.for_feed()
     page_obj = pagin(request, posts)
     context = {
         'page_obj': page_obj,
@@ -27,40 +43,93 @@ def group_list(request, slug):
     return render(request, 'posts/group_list.html', context)
 
 
+@condition(etag_func=etags.profile)
 def profile(request, username):
     author = get_object_or_404(User, username=username)
-    posts = author.posts.select_related('author').all()
+    posts = author.posts.for_feed()
     page_obj = pagin(request, posts)
-    following = False
-    if request.user.is_authenticated:
-        following = Follow.objects.filter(
-            user=request.user,
-            author=author
-        ).exists()
+    following = author.pk in follow_graph.following(request.user.pk)
     context = {
         'author': author,
         'posts': posts,
         'page_obj': page_obj,
         'following': following,
+        'post_count': author_stats(author).posts_count,
     }
     return render(request, 'posts/profile.html', context)
 
 
+def search(request):
+    query = request.GET.get('q', '').strip()
+    fts_query = build_query(query)
+    entries = (
+        SearchEntry.objects.filter(body__match=fts_query)
+        if fts_query else SearchEntry.objects.none()
+    )
+    page_obj = pagin(request, entries, SEARCH_KEYS)
+    posts = Post.objects.for_feed().in_bulk(
+        {entry.post_id for entry in page_obj}
+    )
+    comments = Comment.objects.select_related('author').in_bulk(
+        [entry.object_id for entry in page_obj if entry.kind == 'comment']
+    )
+    for entry in page_obj:
+        entry.post = posts.get(entry.post_id)
+        entry.comment = (
+            comments.get(entry.object_id) if entry.kind == 'comment' else None
+        )
+    page_obj.object_list = [
+        entry for entry in page_obj
+        if entry.post and (entry.kind == 'post' or entry.comment)
+    ]
+    context = {
+        'page_obj': page_obj,
+        'query': query,
+    }
+    return render(request, 'posts/search.html', context)
+
+
+@condition(etag_func=etags.post_detail)
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
-    posts_count = post.author.posts.count()
-    comments = post.comments.all()
+    post = get_object_or_404(Post.objects.for_feed(), pk=post_id)
+    posts_count = author_stats(post.author).posts_count
+    comments = pagin(request, Comment.objects.for_post(post),
+                     COMMENT_KEYS, settings.COMMENT_LIMIT)
     form = CommentForm(request.POST or None)
+    # Свои комментарии из очереди автор видит сразу, в конце списка.
+    pending_comments = []
+    if not comments.next_cursor:
+        pending_comments = comment_queue.pending(post.pk, request.user)
     context = {
         'post': post,
         'posts_count': posts_count,
         'form': form,
-        'comments': comments
+        'comments': comments,
+        'pending_comments': pending_comments,
     }
     return render(request, 'posts/post_detail.html', context)
 
 
+def post_comments(request, post_id):
+    comments = pagin(request, Comment.objects.for_post(post_id),
+                     COMMENT_KEYS, settings.COMMENT_LIMIT)
+    # Непустая страница уже доказывает, что пост есть.
+    if not comments and not Post.objects.filter(pk=post_id).exists():
+        raise Http404
+    pending_comments = []
+    if not comments.next_cursor:
+        pending_comments = comment_queue.pending(post_id, request.user)
+    context = {
+        'post_id': post_id,
+        'comments': comments,
+        'pending_comments': pending_comments,
+    }
+    return render(request, 'posts/includes/comments.html', context)
+
+
 @login_required
+@throttle('post_create', methods=('POST',))
+@transaction.atomic
 def post_create(request):
     form = PostForm(
         request.POST or None,
@@ -70,11 +139,13 @@ def post_create(request):
         post = form.save(commit=False)
         post.author = request.user
         form.save()
+        thumbnails.schedule(post)
         return redirect('posts:profile', request.user.username)
     return render(request, 'posts/create_post.html', {'form': form})
 
 
 @login_required
+@transaction.atomic
 def post_edit(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
     if post.author != request.user:
@@ -87,6 +158,8 @@ def post_edit(request, post_id):
     )
     if form.is_valid():
         form.save()
+        if 'image' in form.changed_data:
+            thumbnails.schedule(post)
         return redirect('posts:post_detail', post_id=post_id)
     context = {
         'form': form,
@@ -97,10 +170,16 @@ def post_edit(request, post_id):
 
 
 @login_required
+@throttle('add_comment', methods=('POST',))
+@transaction.atomic
 def add_comment(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
     form = CommentForm(request.POST or None)
-    if form.is_valid():
+    if form.is_valid() and settings.COMMENT_WRITE_BEHIND:
+        comment_queue.enqueue(
+            post.pk, request.user.pk, form.cleaned_data['text']
+        )
+    elif form.is_valid():
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
@@ -110,30 +189,50 @@ def add_comment(request, post_id):
 
 @login_required
 def follow_index(request):
-    list_posts = Post.objects.filter(
-        author__following__user=request.user
-    ).select_related('author', 'group')
-    page_obj = pagin(request, list_posts)
+    page_obj = pagin(request, timeline.feed(request.user),
+                     timeline.TIMELINE_KEYS)
+    page_obj.object_list = [entry.post for entry in page_obj]
     context = {'page_obj': page_obj}
     return render(request, 'posts/follow.html', context)
 
 
+def popular_index(request):
+    page_obj = pagin(request, popular.popular_feed(), popular.POPULAR_KEYS)
+    page_obj.object_list = [entry.post for entry in page_obj]
+    context = {'page_obj': page_obj}
+    return render(request, 'posts/popular.html', context)
+
+
+@login_required
+def profile_export(request, username):
+    author = get_object_or_404(User, username=username)
+    if author != request.user and not request.user.is_staff:
+        raise PermissionDenied
+    fmt = request.GET.get('format', 'ndjson')
+    if fmt not in export.FORMATS:
+        fmt = 'ndjson'
+    response = StreamingHttpResponse(
+        export.render(export.export_rows(author), fmt),
+        content_type=export.FORMATS[fmt]
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{author.username}.{fmt}"'
+    )
+    return response
+
+
 @login_required
+@throttle('profile_follow')
+@transaction.atomic
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
-    if (
-            not User.objects.filter(
-                username=author,
-                following__user=request.user,
-            ).exists()
-            and author != request.user
-    ):
-        Follow.objects.create(user=request.user, author=author)
+    follow_graph.follow(request.user.pk, author.pk)
     return redirect('posts:profile', username=username)
 
 
 @login_required
+@transaction.atomic
 def profile_unfollow(request, username):
     author = get_object_or_404(User, username=username)
-    Follow.objects.filter(user=request.user, author=author).delete()
+    follow_graph.unfollow(request.user.pk, author.pk)
     return redirect('posts:profile', username=author)
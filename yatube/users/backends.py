@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+
+def user_cache_key(user_id):
+    return f'users:user:{user_id}'
+
+
+def forget_user(user_id):
+    """Сбрасывает закэшированного пользователя после любых изменений."""
+    cache.delete(user_cache_key(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend, который загружает пользователя сессии из кэша.
+
+    Запись в кэше удаляется при сохранении и удалении пользователя
+    (в том числе при смене пароля и обновлении last_login) и при выходе.
+    QuerySet.update сигналов не отправляет: после массового изменения
+    пользователей их записи нужно сбросить через forget_user.
+    """
+
+    def get_user(self, user_id):
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is None:
+                return None
+            cache.set(key, user, settings.USER_CACHE_TIMEOUT)
+        return user if self.user_can_authenticate(user) else None
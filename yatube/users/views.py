@@ -1,9 +1,13 @@
 from django.urls import reverse_lazy
+from django.utils.decorators import method_decorator
 from django.views.generic import CreateView
 
+from core.throttling import throttle
+
 from .forms import CreationForm
 
 
+@method_decorator(throttle('signup', methods=('POST',)), name='dispatch')
 class SignUp(CreateView):
     form_class = CreationForm
     success_url = reverse_lazy('posts:index')
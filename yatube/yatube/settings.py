@@ -18,10 +18,49 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 POST_LIMIT = 10
 
+COMMENT_LIMIT = 20
+
+# Отложенная запись комментариев: add_comment пишет в очередь в
+# отдельном файле SQLite, flush_comments переносит её пачками.
+COMMENT_WRITE_BEHIND = False
+COMMENT_QUEUE_PATH = os.path.join(BASE_DIR, 'comment_queue.sqlite3')
+COMMENT_FLUSH_INTERVAL = 2
+COMMENT_BATCH_SIZE = 200
+
+TIMELINE_DEPTH = 500
+
+FOLLOW_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Рейтинг популярного: окно и период полураспада в секундах.
+POPULAR_WINDOW = 60 * 60 * 24 * 3
+POPULAR_HALF_LIFE = 60 * 60 * 12
+POPULAR_SIZE = 200
+
+FEED_CACHE_TIMEOUT = 60 * 60 * 3
+
+CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+THUMBNAIL_WORKERS = 2
+
 TEXT_MAX_LENGTH = 15
 
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 
+# Token bucket для пишущих страниц: (запросов подряд, за сколько секунд
+# ведро наполняется заново). Области без записи не ограничиваются.
+THROTTLE_RATES = {
+    'post_create': (10, 60 * 10),
+    'add_comment': (20, 60),
+    'profile_follow': (30, 60),
+    'signup': (5, 60 * 60),
+}
+# Гости различаются по IP. За обратным прокси REMOTE_ADDR у всех один —
+# адрес прокси, поэтому IP берётся из заголовка, который прокси
+# дописывает (ключ request.META, например 'HTTP_X_FORWARDED_FOR'), —
+# THROTTLE_TRUSTED_PROXIES-й адрес с конца. None — прокси нет.
+THROTTLE_CLIENT_IP_HEADER = None
+THROTTLE_TRUSTED_PROXIES = 1
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/2.2/howto/deployment/checklist/
@@ -39,6 +78,11 @@ ALLOWED_HOSTS = [
     'testserver',
 ]
 
+AUTHENTICATION_BACKENDS = ['users.backends.CachedModelBackend']
+# Пользователь и сессия авторизованного запроса читаются из кэша.
+USER_CACHE_TIMEOUT = 60 * 60
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
 LOGIN_URL = '/auth/login/'
 LOGIN_REDIRECT_URL = 'posts:index'
 # LOGOUT_REDIRECT_URL = 'posts:index'
@@ -49,6 +93,11 @@ EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 # указываем директорию, в которую будут складываться файлы
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Загрузки больше этого размера пишутся во временный файл, а не в память.
+FILE_UPLOAD_MAX_MEMORY_SIZE = 512 * 1024
+# Картинки постов ужимаются до этого размера по большей стороне.
+IMAGE_MAX_SIZE = 2048
+IMAGE_QUALITY = 85
 
 
 # Application definition
@@ -68,15 +117,19 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.QueryCountMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.ReplicaMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+QUERY_STATS_HEADER = DEBUG
+
 ROOT_URLCONF = 'yatube.urls'
 
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
@@ -113,6 +166,37 @@ DATABASES = {
     }
 }
 
+# Реплики для чтения лент и страниц постов (core.replicas). Локально
+# это копии db.sqlite3, которые обновляет команда sync_replicas:
+# YATUBE_SQLITE_REPLICAS=2 python manage.py sync_replicas --interval 1
+DATABASE_REPLICAS = [
+    f'replica{number}'
+    for number in range(int(os.environ.get('YATUBE_SQLITE_REPLICAS', 0)))
+]
+for alias in DATABASE_REPLICAS:
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'NAME': os.path.join(BASE_DIR, f'{alias}.sqlite3'),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['core.replicas.PrimaryReplicaRouter']
+
+# Сколько секунд после записи пользователь читает только с default.
+REPLICA_PIN_SECONDS = 10
+
+# Выполняются на каждом новом соединении с SQLite (core.sqlite).
+# WAL даёт читателям работать параллельно с записью, synchronous=normal
+# в режиме WAL не теряет целостность при сбое процесса.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout': 5000,
+    'cache_size': -64 * 1024,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'memory',
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
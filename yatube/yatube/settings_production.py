@@ -0,0 +1,79 @@
+"""Настройки продакшена.
+
+Включаются переменной окружения
+DJANGO_SETTINGS_MODULE=yatube.settings_production, всё остальное
+берётся из yatube/settings.py. Проверить, что медленные значения
+по умолчанию не остались, можно командой
+python manage.py check --deploy --tag performance
+"""
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import CACHES, DATABASES, SECRET_KEY, TEMPLATES
+
+DEBUG = False
+
+QUERY_STATS_HEADER = False
+
+SECRET_KEY = os.environ.get('YATUBE_SECRET_KEY', SECRET_KEY)
+
+ALLOWED_HOSTS = os.environ.get('YATUBE_ALLOWED_HOSTS', 'localhost').split(',')
+
+# Шаблоны компилируются один раз на процесс.
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        'APP_DIRS': False,
+        'OPTIONS': {
+            **TEMPLATES[0]['OPTIONS'],
+            'context_processors': [
+                processor
+                for processor in TEMPLATES[0]['OPTIONS']['context_processors']
+                if processor != 'django.template.context_processors.debug'
+            ],
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
+        },
+    },
+]
+
+# Соединение с базой переживает запрос, а не открывается на каждый.
+DATABASES = {
+    alias: {
+        **database,
+        'CONN_MAX_AGE': int(os.environ.get('YATUBE_CONN_MAX_AGE', 600)),
+    }
+    for alias, database in DATABASES.items()
+}
+
+# Кэш общий для всех процессов: версии лент, карточки и миниатюры
+# видны каждому воркеру, а не только тому, кто их записал.
+CACHES = {
+    'default': {
+        **CACHES['default'],
+        'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+        'LOCATION': os.environ.get('YATUBE_MEMCACHED', '127.0.0.1:11211'),
+    }
+}
+
+SESSION_COOKIE_AGE = 60 * 60 * 24 * 14
+SESSION_SAVE_EVERY_REQUEST = False
+
+# Имена статики с хешем содержимого: можно отдавать с вечным кэшем.
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')  # noqa: F405
+STATICFILES_STORAGE = (
+    'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'
+)
+
+# Приложение стоит за обратным прокси, который дописывает адрес
+# клиента в X-Forwarded-For.
+THROTTLE_CLIENT_IP_HEADER = os.environ.get(
+    'YATUBE_CLIENT_IP_HEADER', 'HTTP_X_FORWARDED_FOR')
+THROTTLE_TRUSTED_PROXIES = int(os.environ.get('YATUBE_TRUSTED_PROXIES', 1))
+
+DATA_UPLOAD_MAX_MEMORY_SIZE = 5 * 1024 * 1024
+FILE_UPLOAD_MAX_MEMORY_SIZE = 256 * 1024